@@ -1,7 +1,8 @@
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
+import orjson
 import time
 import logging
 
@@ -18,7 +19,8 @@ app = FastAPI(
     description="API for civic issue reporting and management system",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
 # Security middleware
@@ -51,13 +53,16 @@ async def add_process_time_header(request: Request, call_next):
     response.headers["X-Process-Time"] = str(process_time)
     return response
 
-# Global exception handler
+# Global exception handler; the body never changes, so it is serialized once
+_INTERNAL_ERROR_BODY = orjson.dumps({"detail": "Internal server error occurred"})
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     logger.error(f"Global exception: {str(exc)}")
-    return JSONResponse(
+    return Response(
         status_code=500,
-        content={"detail": "Internal server error occurred"}
+        content=_INTERNAL_ERROR_BODY,
+        media_type="application/json"
     )
 
 # Include all routers with proper prefixes
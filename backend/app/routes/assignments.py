@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi import APIRouter, HTTPException, status, Depends, Query, BackgroundTasks
 from app.supabase_client import (
     insert_data, get_data, update_data, delete_data,
     get_paginated_data, get_assignments_with_details
@@ -57,6 +57,7 @@ def calculate_deadline(category: str, priority: str = "medium") -> datetime:
 @router.post("/", response_model=AssignmentResponse, status_code=status.HTTP_201_CREATED)
 async def create_assignment(
     assignment: AssignmentCreate,
+    background_tasks: BackgroundTasks,
     current_user: dict = Depends(require_roles(["admin", "supervisor"]))
 ):
     """Create a new assignment (admin/supervisor only)."""
@@ -149,9 +150,10 @@ async def create_assignment(
         
         assignment_response_data = _process_assignment_data(created_assignment[0])
         
-        # Send notification
+        # Send notification after the response is returned
         try:
-            NotificationService.notify_issue_assigned(
+            background_tasks.add_task(
+                NotificationService.notify_issue_assigned,
                 issue, assignment_response_data, staff_member
             )
         except Exception as e:
@@ -417,6 +419,7 @@ async def get_assignment(
 async def update_assignment(
     assignment_id: int,
     assignment_update: AssignmentUpdate,
+    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_user)
 ):
     """Update assignment status."""
@@ -473,7 +476,9 @@ async def update_assignment(
                     issue_data = get_data("issues", {"id": issue_id})
                     citizen_data = get_data("profiles", {"id": issue_data[0]["citizen_id"]})
                     if issue_data and citizen_data:
-                        NotificationService.notify_issue_resolved(issue_data[0], citizen_data[0])
+                        background_tasks.add_task(
+                            NotificationService.notify_issue_resolved, issue_data[0], citizen_data[0]
+                        )
                 except Exception as e:
                     logger.warning(f"Failed to send resolution notification: {str(e)}")
         elif assignment_update.status == "in_progress":
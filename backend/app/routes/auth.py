@@ -5,11 +5,15 @@ from app.supabase_client import (
     sign_up_user, sign_in_user, get_user_from_token, 
     insert_data, get_data, sign_out_user, update_data
 )
+from app.services.notification_service import invalidate_role_cache
 from app.schemas import (
     UserLogin, UserRegister, AuthResponse, ProfileResponse, 
     TokenResponse, BaseResponse
 )
-from typing import Optional
+from typing import Optional, Dict, Set
+from hashlib import blake2b
+from cachetools import TTLCache
+import threading
 import logging
 from pydantic import BaseModel
 
@@ -20,6 +24,37 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 security = HTTPBearer(auto_error=False)
 
+# Authenticated user cache: token hash -> {"user", "profile"}.
+# Saves the auth + profile round-trips on every authenticated request.
+# The cache is per-process: with several workers, an invalidation only reaches the
+# worker that made the change and the others catch up when the TTL expires.
+_auth_cache: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+_auth_cache_keys_by_user: Dict[str, Set[bytes]] = {}
+_auth_cache_lock = threading.Lock()
+
+
+def _token_cache_key(token: str) -> bytes:
+    """Hash a bearer token into a compact cache key."""
+    return blake2b(token.encode(), digest_size=16).digest()
+
+
+def _cache_auth_entry(key: bytes, user, profile: dict) -> None:
+    """Store an authenticated user and track the key under its user id."""
+    user_id = profile["id"]
+    with _auth_cache_lock:
+        _auth_cache[key] = {"user": user, "profile": profile}
+        # Drop keys that already expired out of the TTL cache
+        keys = {k for k in _auth_cache_keys_by_user.get(user_id, ()) if k in _auth_cache}
+        keys.add(key)
+        _auth_cache_keys_by_user[user_id] = keys
+
+
+def invalidate_user_cache(user_id: str) -> None:
+    """Evict all cached authentications for a user (logout, profile or role change)."""
+    with _auth_cache_lock:
+        for key in _auth_cache_keys_by_user.pop(user_id, ()):
+            _auth_cache.pop(key, None)
+
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
     """Get current user from JWT token."""
@@ -32,6 +67,17 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     
     try:
         token = credentials.credentials
+        cache_key = _token_cache_key(token)
+        
+        with _auth_cache_lock:
+            cached = _auth_cache.get(cache_key)
+        if cached:
+            return {
+                "user": cached["user"],
+                "profile": dict(cached["profile"]),
+                "token": token
+            }
+        
         user_response = get_user_from_token(token)
         
         if not user_response or not user_response.user:
@@ -49,9 +95,11 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
                 detail="User profile not found"
             )
         
+        _cache_auth_entry(cache_key, user_response.user, profile_data[0])
+        
         return {
             "user": user_response.user,
-            "profile": profile_data[0],
+            "profile": dict(profile_data[0]),
             "token": token
         }
     except HTTPException:
@@ -186,6 +234,8 @@ async def register(request: Request):
             if update_fields:
                 updated_profile = update_data("profiles", {"id": user_id}, update_fields)
                 profile_data = updated_profile[0] if updated_profile else profile_data
+                invalidate_user_cache(user_id)
+                invalidate_role_cache()
             
             logger.info(f"Assigned role before update: {assigned_role}")
             logger.info(f"Profile data before update: {profile_data}")
@@ -208,6 +258,7 @@ async def register(request: Request):
                     detail="Failed to create user profile"
                 )
             profile_data = profile_result[0]
+            invalidate_role_cache()
         
         # Check if session exists (user might need email confirmation)
         if auth_response.session and auth_response.session.access_token:
@@ -314,6 +365,8 @@ async def login(credentials: UserLogin):
 async def logout(current_user: dict = Depends(get_current_user)):
     """Logout user."""
     try:
+        invalidate_user_cache(current_user["profile"]["id"])
+        
         # Sign out from Supabase (this invalidates the session)
         sign_out_user(current_user["token"])
         
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Query, Form, UploadFile, File
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Form, UploadFile, File, BackgroundTasks
 
 from app.supabase_client import (
     insert_data, get_data, update_data, delete_data, count_records, upload_file_from_bytes,
@@ -214,6 +214,7 @@ async def upload_issue_image_with_auth(
 @router.post("/", response_model=IssueResponse, status_code=status.HTTP_201_CREATED)
 async def create_issue(
     issue: IssueCreate, 
+    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_user)
 ):
     """Create a new issue with authenticated user context."""
@@ -253,11 +254,12 @@ async def create_issue(
         # Process issue data
         issue_response_data = _process_issue_data(created_issue[0])
         
-        # Send notification
+        # Send notification after the response is returned
         try:
             citizen_data = get_data("profiles", {"id": issue.citizen_id})
             if citizen_data:
-                NotificationService.notify_issue_created(
+                background_tasks.add_task(
+                    NotificationService.notify_issue_created,
                     issue_response_data, 
                     citizen_data[0]
                 )
@@ -279,6 +281,7 @@ async def create_issue(
 
 @router.post("/create-with-image", response_model=IssueResponse, status_code=status.HTTP_201_CREATED)
 async def create_issue_with_image(
+    background_tasks: BackgroundTasks,
     title: str = Form(...),
     description: str = Form(...),
     category: str = Form(...),
@@ -349,11 +352,12 @@ async def create_issue_with_image(
         # Process and return issue data
         issue_response_data = _process_issue_data(created_issue[0])
         
-        # Send notification
+        # Send notification after the response is returned
         try:
             citizen_data = get_data("profiles", {"id": user_id})
             if citizen_data:
-                NotificationService.notify_issue_created(
+                background_tasks.add_task(
+                    NotificationService.notify_issue_created,
                     issue_response_data, 
                     citizen_data[0]
                 )
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi import APIRouter, HTTPException, status, Depends, Query, BackgroundTasks
 from app.supabase_client import (
     insert_data, get_data, update_data, delete_data,
     get_updates_with_details
@@ -37,6 +37,7 @@ def _process_update_data(update_data: dict) -> dict:
 @router.post("/", response_model=IssueUpdateResponse, status_code=status.HTTP_201_CREATED)
 async def create_issue_update(
     update: IssueUpdateCreate, 
+    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_user)
 ):
     """Create a new issue update."""
@@ -128,7 +129,8 @@ async def create_issue_update(
         try:
             citizen_data = get_data("profiles", {"id": issue["citizen_id"]})
             if citizen_data:
-                NotificationService.notify_issue_updated(
+                background_tasks.add_task(
+                    NotificationService.notify_issue_updated,
                     issue, update_response_data, citizen_data[0]
                 )
         except Exception as e:
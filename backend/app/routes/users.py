@@ -1,10 +1,13 @@
 from fastapi import APIRouter, HTTPException, status, Depends, Query
-from app.supabase_client import get_data, update_data, get_paginated_data, search_data
+from app.supabase_client import (
+    get_data, update_data, get_paginated_data, search_paginated_data, execute_rpc, count_data
+)
 from app.schemas import (
     ProfileResponse, ProfileUpdate, PaginationResponse, 
     BaseResponse
 )
-from app.routes.auth import get_current_user, require_roles
+from app.routes.auth import get_current_user, require_roles, invalidate_user_cache
+from app.services.notification_service import invalidate_role_cache
 from typing import List, Optional
 import logging
 
@@ -40,18 +43,15 @@ async def list_users(
         
         # Search functionality
         if search:
-            users = search_data(
+            paginated_users, total = search_paginated_data(
                 table="profiles",
                 search_fields=["full_name", "phone"],
                 search_term=search,
+                page=page,
+                per_page=per_page,
                 filters=filters,
                 order_by="-created_at"
             )
-            total = len(users)
-            # Manual pagination for search results
-            start = (page - 1) * per_page
-            end = start + per_page
-            paginated_users = users[start:end]
         else:
             paginated_users, total = get_paginated_data(
                 table="profiles",
@@ -97,10 +97,12 @@ async def list_staff_users(
         if available_only:
             available_staff = []
             for staff_member in staff:
-                # Get active assignments count
+                # Get active assignments, capped at the availability threshold
                 active_assignments = get_data(
                     "issue_assignments",
-                    {"staff_id": staff_member["id"], "status": ["assigned", "in_progress"]}
+                    {"staff_id": staff_member["id"], "status": ["assigned", "in_progress"]},
+                    select_fields="id",
+                    limit=5
                 )
                 # Consider staff available if they have less than 5 active assignments
                 if len(active_assignments) < 5:
@@ -128,10 +130,13 @@ async def list_departments(
         departments = get_data(
             "profiles",
             select_fields="DISTINCT department",
-            filters={"role": {"operator": "in", "value": ["staff", "supervisor", "admin"]}}
+            filters={
+                "role": {"operator": "in", "value": ["staff", "supervisor", "admin"]},
+                "department": {"operator": "not.is", "value": "null"}
+            }
         )
         
-        dept_list = [dept["department"] for dept in departments if dept["department"]]
+        dept_list = [dept["department"] for dept in departments]
         dept_list = list(set(dept_list))  # Remove duplicates
         dept_list.sort()
         
@@ -170,11 +175,8 @@ async def get_user_stats(
             if user_department:
                 filters["department"] = user_department
         
-        # Get all users
-        if filters:
-            all_users = get_data("profiles", filters=filters)
-        else:
-            all_users = get_data("profiles")
+        # Get all users (only the columns the breakdown needs)
+        all_users = get_data("profiles", filters=filters or None, select_fields="role, department")
         
         # Calculate stats
         stats["total_users"] = len(all_users)
@@ -225,28 +227,22 @@ async def get_user(
                 detail="Not authorized to view this user"
             )
         
+        users = get_data("profiles", {"id": user_id})
+        if not users:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        
         # Supervisors can only view users in their department
         if user_role == "supervisor" and current_user_id != user_id:
             user_department = current_user["profile"]["department"]
-            target_user = get_data("profiles", {"id": user_id})
-            if not target_user:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="User not found"
-                )
-            if target_user[0].get("department") != user_department:
+            if users[0].get("department") != user_department:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="Not authorized to view users outside your department"
                 )
         
-        users = get_data("profiles", {"id": user_id})
-        if not users:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-        
         return ProfileResponse(**users[0])
         
     except HTTPException:
@@ -277,33 +273,37 @@ async def update_user(
                 detail="Not authorized to update this user"
             )
         
-        # Check if user exists
-        existing_users = get_data("profiles", {"id": user_id})
-        if not existing_users:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-        
         # Prepare update data
-        update_dict = profile_update.dict(exclude_unset=True, exclude_none=True)
+        update_dict = profile_update.model_dump(exclude_unset=True, exclude_none=True)
         
         # Regular users cannot change their department
-        if user_role != "admin" and "department" in update_dict:
-            del update_dict["department"]
+        if user_role != "admin":
+            update_dict.pop("department", None)
         
         if not update_dict:
+            # Nothing to change: the caller's own profile is already loaded
+            if current_user_id == user_id:
+                return ProfileResponse.model_construct(**current_user["profile"])
+            
+            existing_users = get_data("profiles", {"id": user_id})
+            if not existing_users:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="User not found"
+                )
             return ProfileResponse(**existing_users[0])
         
-        # Update user
+        # Update user; no matched row means the user does not exist
         updated_users = update_data("profiles", {"id": user_id}, update_dict)
         
         if not updated_users:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to update user"
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
             )
         
+        invalidate_user_cache(user_id)
+        invalidate_role_cache()
         logger.info(f"User {user_id} updated by {current_user_id}")
         return ProfileResponse(**updated_users[0])
         
@@ -343,12 +343,17 @@ async def get_user_workload(
             )
         
         # Get assignments
-        all_assignments = get_data("issue_assignments", {"staff_id": user_id})
-        active_assignments = get_data(
+        total_assignments = count_data("issue_assignments", {"staff_id": user_id})
+        active_filters = {"staff_id": user_id, "status": ["assigned", "in_progress"]}
+        active_assignments = count_data("issue_assignments", active_filters)
+        top_active_assignments = get_data(
             "issue_assignments",
-            {"staff_id": user_id, "status": ["assigned", "in_progress"]}
+            active_filters,
+            select_fields="id, issue_id, status, assigned_at",
+            order_by="-assigned_at",
+            limit=5
         )
-        completed_assignments = get_data(
+        completed_assignments = count_data(
             "issue_assignments",
             {"staff_id": user_id, "status": "completed"}
         )
@@ -365,9 +370,9 @@ async def get_user_workload(
             "user_id": user_id,
             "full_name": target_user[0].get("full_name"),
             "department": target_user[0].get("department"),
-            "total_assignments": len(all_assignments),
-            "active_assignments": len(active_assignments),
-            "completed_assignments": len(completed_assignments),
+            "total_assignments": total_assignments,
+            "active_assignments": active_assignments,
+            "completed_assignments": completed_assignments,
             "recent_updates_count": len(recent_updates),
             "assignments": [
                 {
@@ -376,7 +381,7 @@ async def get_user_workload(
                     "status": assignment["status"],
                     "assigned_at": assignment["assigned_at"]
                 }
-                for assignment in active_assignments[:5]  # Show top 5 active
+                for assignment in top_active_assignments  # Most recent 5 active
             ]
         }
         
@@ -408,35 +413,26 @@ async def change_user_role(
                 detail=f"Invalid role. Must be one of: {', '.join(valid_roles)}"
             )
         
-        # Check if user exists
-        existing_users = get_data("profiles", {"id": user_id})
-        if not existing_users:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
+        # Update role; the last-admin guard runs inside the same transaction
+        updated_users = execute_rpc("change_user_role_safe", {
+            "p_user_id": user_id,
+            "p_new_role": new_role
+        })
         
-        current_role = existing_users[0].get("role")
-        
-        # Prevent changing the last admin
-        if current_role == "admin" and new_role != "admin":
-            admin_count = len(get_data("profiles", {"role": "admin"}))
-            if admin_count <= 1:
+        if not updated_users:
+            if not get_data("profiles", {"id": user_id}, select_fields="id"):
                 raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Cannot change role of the last admin user"
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="User not found"
                 )
-        
-        # Update role
-        updated_users = update_data("profiles", {"id": user_id}, {"role": new_role})
-        
-        if not updated_users:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to update user role"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cannot change role of the last admin user"
             )
         
-        logger.info(f"User {user_id} role changed from {current_role} to {new_role} by admin {current_user['profile']['id']}")
+        invalidate_user_cache(user_id)
+        invalidate_role_cache()
+        logger.info(f"User {user_id} role changed to {new_role} by admin {current_user['profile']['id']}")
         return ProfileResponse(**updated_users[0])
         
     except HTTPException:
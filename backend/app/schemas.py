@@ -1,5 +1,5 @@
 # app/schemas.py - Complete schemas file with ALL required imports for dashboard
-from pydantic import BaseModel, EmailStr, Field, validator
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, validator
 from typing import Optional, Literal, List, Union, Dict, Any
 from datetime import datetime
 import re
@@ -78,8 +78,7 @@ class ProfileResponse(ProfileBase):
     id: str
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, extra="ignore", frozen=True)
 
 
 # Authentication schemas
@@ -213,8 +212,7 @@ class IssueResponse(IssueBase):
     days_open: Optional[int] = 0
     user_has_voted: Optional[bool] = False
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, extra="ignore", frozen=True)
 
 
 class IssueListResponse(BaseResponse):
@@ -284,8 +282,7 @@ class AssignmentResponse(AssignmentBase):
     is_overdue: Optional[bool] = False
     days_until_deadline: Optional[int] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, extra="ignore", frozen=True)
 
 # Add to backend/app/schemas.py
 class SLAConfig(BaseModel):
@@ -474,8 +471,7 @@ class NotificationResponse(BaseModel):
     read: bool = False
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, extra="ignore", frozen=True)
 
 
 class NotificationListResponse(BaseResponse):
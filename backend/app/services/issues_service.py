@@ -1,13 +1,83 @@
 from app.supabase_client import (
-    insert_data, get_data, update_data, delete_data, count_records,
-    get_paginated_data, search_data, get_user_vote_status
+    insert_data, get_data, update_data, delete_data,
+    get_paginated_data, search_paginated_data, get_user_vote_status,
+    execute_rpc, exists_data
 )
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Set, Tuple
+from cachetools import TTLCache
+import copy
+import sys
+import threading
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from operator import itemgetter
+from collections import Counter
+from itertools import islice
+import heapq
 
 logger = logging.getLogger(__name__)
 
+# Short-lived cache of single-issue lookups: (issue_id, include_citizen_info) -> row
+_issue_cache: TTLCache = TTLCache(maxsize=10_000, ttl=30)
+_issue_cache_lock = threading.Lock()
+
+# Dashboard statistics per scope: ("admin",), (role, user_id) or ("supervisor", department)
+_stats_cache: TTLCache = TTLCache(maxsize=1_000, ttl=60)
+_stats_cache_lock = threading.Lock()
+
+# Category insights: (category, days) -> insights; at most 60s stale
+_insights_cache: TTLCache = TTLCache(maxsize=128, ttl=60)
+_insights_cache_lock = threading.Lock()
+
+
+def _invalidate_stats_cache() -> None:
+    """Drop all cached statistics; any issue write can move every scope's counts."""
+    with _stats_cache_lock:
+        _stats_cache.clear()
+    with _insights_cache_lock:
+        _insights_cache.clear()
+
+
+def _invalidate_issue_cache(*issue_ids: int) -> None:
+    """Drop cached lookups for the given issues after a write."""
+    with _issue_cache_lock:
+        for issue_id in issue_ids:
+            _issue_cache.pop((issue_id, True), None)
+            _issue_cache.pop((issue_id, False), None)
+    _invalidate_stats_cache()
+
+
+if sys.version_info >= (3, 11):
+    # Accepts the trailing "Z" natively
+    _fromisoformat = datetime.fromisoformat
+else:
+    def _fromisoformat(value: str) -> datetime:
+        if value.endswith("Z"):
+            value = value[:-1] + "+00:00"
+        return datetime.fromisoformat(value)
+
+
+@lru_cache(maxsize=8192)
+def _parse_timestamp(value: str) -> datetime:
+    """Parse a Supabase ISO timestamp into an aware datetime (UTC if no offset)."""
+    parsed = _fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _jaccard(query_words: Set[str], words: Set[str]) -> float:
+    """Jaccard similarity between two token sets."""
+    shared = len(query_words & words)
+    # |A ∪ B| = |A| + |B| - |A ∩ B|, without building the union
+    union = len(query_words) + len(words) - shared
+    return shared / union if union else 0.0
+
+
+def _jaccard_upper_bound(len_a: int, len_b: int) -> float:
+    """Largest Jaccard similarity possible between sets of these sizes."""
+    larger = max(len_a, len_b)
+    return min(len_a, len_b) / larger if larger else 0.0
+
 
 class IssuesService:
     """Service class for issue-related business logic."""
@@ -48,6 +118,7 @@ class IssuesService:
             if not result:
                 raise Exception("Failed to create issue in database")
             
+            _invalidate_stats_cache()
             logger.info(f"Issue created successfully: {result[0]['id']}")
             return result[0]
             
@@ -77,9 +148,20 @@ class IssuesService:
     def get_issue_by_id(issue_id: int, include_citizen_info: bool = True) -> Optional[Dict[str, Any]]:
         """Get issue by ID with optional citizen information."""
         try:
+            cache_key = (issue_id, include_citizen_info)
+            with _issue_cache_lock:
+                cached = _issue_cache.get(cache_key)
+            if cached is not None:
+                return dict(cached)
+            
             select_fields = "*, profiles!citizen_id(full_name, phone)" if include_citizen_info else "*"
             issues = get_data("issues", {"id": issue_id}, select_fields=select_fields)
-            return issues[0] if issues else None
+            if not issues:
+                return None
+            
+            with _issue_cache_lock:
+                _issue_cache[cache_key] = issues[0]
+            return dict(issues[0])
         except Exception as e:
             logger.error(f"Failed to get issue {issue_id}: {str(e)}")
             raise
@@ -120,6 +202,7 @@ class IssuesService:
             
             # Update issue
             result = update_data("issues", {"id": issue_id}, new_data)
+            _invalidate_issue_cache(issue_id)
             
             if not result:
                 raise Exception("Failed to update issue in database")
@@ -135,19 +218,12 @@ class IssuesService:
     def delete_issue(issue_id: int, user_id: str) -> bool:
         """Delete an issue and all related data (admin only)."""
         try:
-            # Check if issue exists
-            existing_issue = IssuesService.get_issue_by_id(issue_id, include_citizen_info=False)
-            if not existing_issue:
+            # Votes, updates and assignments are removed by ON DELETE CASCADE
+            deleted = delete_data("issues", {"id": issue_id})
+            _invalidate_issue_cache(issue_id)
+            if not deleted:
                 raise ValueError("Issue not found")
             
-            # Delete related records first
-            delete_data("issue_votes", {"issue_id": issue_id})
-            delete_data("issue_updates", {"issue_id": issue_id})
-            delete_data("issue_assignments", {"issue_id": issue_id})
-            
-            # Delete the issue
-            delete_data("issues", {"id": issue_id})
-            
             logger.info(f"Issue {issue_id} deleted by admin {user_id}")
             return True
             
@@ -159,26 +235,19 @@ class IssuesService:
     def vote_on_issue(issue_id: int, user_id: str) -> Dict[str, Any]:
         """Vote on an issue (upvote)."""
         try:
-            # Check if issue exists
-            issue = IssuesService.get_issue_by_id(issue_id, include_citizen_info=False)
-            if not issue:
-                raise ValueError("Issue not found")
+            # Insert and duplicate check happen atomically in the database
+            try:
+                result = execute_rpc("cast_vote", {"iid": issue_id, "uid": user_id})
+            except Exception as e:
+                if "23503" in str(e) or "foreign key" in str(e).lower():
+                    raise ValueError("Issue not found")
+                raise
             
-            # Check if user already voted
-            existing_votes = get_data("issue_votes", {"issue_id": issue_id, "user_id": user_id})
-            if existing_votes:
+            if not result:
                 raise ValueError("User has already voted on this issue")
             
-            # Create vote
-            vote_data = {
-                "issue_id": issue_id,
-                "user_id": user_id
-            }
-            
-            result = insert_data("issue_votes", vote_data)
-            
-            if not result:
-                raise Exception("Failed to record vote")
+            # The vote trigger changed the issue's upvotes
+            _invalidate_issue_cache(issue_id)
             
             # The upvote count is automatically updated by database trigger
             logger.info(f"User {user_id} voted on issue {issue_id}")
@@ -193,12 +262,12 @@ class IssuesService:
         """Remove a vote from an issue."""
         try:
             # Check if vote exists
-            existing_votes = get_data("issue_votes", {"issue_id": issue_id, "user_id": user_id})
-            if not existing_votes:
+            if not exists_data("issue_votes", {"issue_id": issue_id, "user_id": user_id}):
                 raise ValueError("Vote not found")
             
             # Delete vote
             delete_data("issue_votes", {"issue_id": issue_id, "user_id": user_id})
+            _invalidate_issue_cache(issue_id)
             
             # The upvote count is automatically updated by database trigger
             logger.info(f"User {user_id} removed vote from issue {issue_id}")
@@ -217,23 +286,17 @@ class IssuesService:
                 return IssuesService.get_all_issues(filters, page, per_page)
             
             search_fields = ["title", "description"]
-            results = search_data(
+            return search_paginated_data(
                 table="issues",
                 search_fields=search_fields,
                 search_term=query,
+                page=page,
+                per_page=per_page,
                 filters=filters,
                 select_fields="*, profiles!citizen_id(full_name, phone)",
                 order_by="-created_at"
             )
             
-            # Manual pagination for search results
-            total = len(results)
-            start = (page - 1) * per_page
-            end = start + per_page
-            paginated_results = results[start:end]
-            
-            return paginated_results, total
-            
         except Exception as e:
             logger.error(f"Failed to search issues: {str(e)}")
             raise
@@ -259,40 +322,16 @@ class IssuesService:
                          limit: int = 20) -> List[Dict[str, Any]]:
         """Get issues near a specific location."""
         try:
-            # Add location filters
-            location_filters = {
-                "latitude": {"operator": "neq", "value": None},
-                "longitude": {"operator": "neq", "value": None}
-            }
-            
-            if filters:
-                location_filters.update(filters)
-            
-            # Get all issues with location
-            issues = get_data(
-                "issues",
-                filters=location_filters,
-                select_fields="*, profiles!citizen_id(full_name, phone)",
-                order_by="-created_at",
-                limit=limit * 3  # Get more to account for distance filtering
-            )
+            # Distance filtering and ordering run in PostGIS against a spatial index
+            nearby_issues = execute_rpc("nearby_issues", {
+                "lat": latitude,
+                "lng": longitude,
+                "radius_km": radius,
+                "lim": limit,
+                "p_filters": filters or None
+            })
             
-            # Simple distance calculation (Haversine formula would be better)
-            nearby_issues = []
-            for issue in issues:
-                if issue["latitude"] and issue["longitude"]:
-                    # Simple distance approximation
-                    lat_diff = abs(latitude - issue["latitude"])
-                    lng_diff = abs(longitude - issue["longitude"])
-                    approx_distance = ((lat_diff ** 2) + (lng_diff ** 2)) ** 0.5 * 111  # Rough km conversion
-                    
-                    if approx_distance <= radius:
-                        issue["distance"] = round(approx_distance, 2)
-                        nearby_issues.append(issue)
-            
-            # Sort by distance and limit results
-            nearby_issues.sort(key=lambda x: x.get("distance", 0))
-            return nearby_issues[:limit]
+            return nearby_issues or []
             
         except Exception as e:
             logger.error(f"Failed to get nearby issues: {str(e)}")
@@ -302,6 +341,33 @@ class IssuesService:
     def get_issue_statistics(user_role: str, user_id: str, 
                            user_department: Optional[str] = None) -> Dict[str, Any]:
         """Get issue statistics based on user role."""
+        try:
+            if user_role == "admin":
+                cache_key = ("admin",)
+            elif user_role == "supervisor":
+                cache_key = ("supervisor", user_department)
+            else:
+                cache_key = (user_role, user_id)
+            
+            with _stats_cache_lock:
+                cached = _stats_cache.get(cache_key)
+            if cached is not None:
+                return copy.deepcopy(cached)
+            
+            stats = IssuesService._compute_issue_statistics(user_role, user_id, user_department)
+            
+            with _stats_cache_lock:
+                _stats_cache[cache_key] = stats
+            return copy.deepcopy(stats)
+            
+        except Exception as e:
+            logger.error(f"Failed to get issue statistics: {str(e)}")
+            raise
+    
+    @staticmethod
+    def _compute_issue_statistics(user_role: str, user_id: str,
+                                  user_department: Optional[str] = None) -> Dict[str, Any]:
+        """Run the statistics queries for one role scope."""
         try:
             stats = {
                 "total_issues": 0,
@@ -328,83 +394,49 @@ class IssuesService:
                 else:
                     return stats  # No assigned issues
             elif user_role == "supervisor":
-                # Get issues assigned to staff in supervisor's department
+                # Issues assigned to staff in supervisor's department (joined in issue_stats)
                 if user_department:
-                    dept_staff = get_data("profiles", {"department": user_department, "role": "staff"})
-                    staff_ids = [s["id"] for s in dept_staff]
-                    
-                    if staff_ids:
-                        assignments = get_data("issue_assignments", {"staff_id": staff_ids})
-                        dept_issue_ids = list(set([a["issue_id"] for a in assignments]))
-                        
-                        if dept_issue_ids:
-                            filters["id"] = dept_issue_ids
-                        else:
-                            return stats  # No issues in department
-                    else:
-                        return stats  # No staff in department
+                    filters["department"] = user_department
                 else:
                     return stats  # No department specified
             # Admin has no filters (sees all issues)
             
-            # Calculate basic counts
-            stats["total_issues"] = count_records("issues", filters)
-            stats["pending_issues"] = count_records("issues", {**filters, "status": "pending"})
-            stats["in_progress_issues"] = count_records("issues", {**filters, "status": "in_progress"})
-            stats["resolved_issues"] = count_records("issues", {**filters, "status": "resolved"})
-            
-            # Issues by category
+            # Status, category and total counts, total upvotes and average resolution
+            # time in a single grouped query
             categories = ["potholes", "DamagedElectricalPoles", "Garbage", "WaterLogging", "FallenTrees"]
-            for category in categories:
-                count = count_records("issues", {**filters, "category": category})
-                stats["issues_by_category"][category] = count
-            
-            # Total upvotes
-            all_issues = get_data("issues", filters=filters, select_fields="upvotes")
-            stats["total_upvotes"] = sum(issue.get("upvotes", 0) for issue in all_issues)
-            
-            # Average resolution time for resolved issues
-            resolved_issues = get_data("issues", {**filters, "status": "resolved"})
-            if resolved_issues:
-                total_days = 0
-                count = 0
-                
-                for issue in resolved_issues:
-                    try:
-                        created_at = datetime.fromisoformat(issue["created_at"].replace("Z", "+00:00"))
-                        updated_at = datetime.fromisoformat(issue["updated_at"].replace("Z", "+00:00"))
-                        resolution_days = (updated_at - created_at).days
-                        total_days += resolution_days
-                        count += 1
-                    except Exception:
-                        continue
-                
-                if count > 0:
-                    stats["avg_resolution_time"] = round(total_days / count, 1)
+            stats["issues_by_category"] = {category: 0 for category in categories}
+            
+            grouped_counts = execute_rpc("issue_stats", {
+                "filter_ids": filters.get("id"),
+                "citizen": filters.get("citizen_id"),
+                "dept": filters.get("department")
+            }) or []
+            
+            for row in grouped_counts:
+                # GROUPING() flags tell totals apart from real NULL status/category groups
+                if row["grouping_status"] and row["grouping_category"]:
+                    stats["total_issues"] = row["cnt"]
+                    stats["total_upvotes"] = row["upvotes"]
+                    if row["avg_resolution_days"] is not None:
+                        stats["avg_resolution_time"] = round(float(row["avg_resolution_days"]), 1)
+                elif row["grouping_category"]:
+                    status_key = f"{row['status']}_issues"
+                    if status_key in stats:
+                        stats[status_key] = row["cnt"]
+                elif row["category"] in stats["issues_by_category"]:
+                    stats["issues_by_category"][row["category"]] = row["cnt"]
             
             # Issues by department (admin only)
             if user_role == "admin":
-                departments = get_data("profiles", 
-                                     select_fields="DISTINCT department", 
-                                     filters={"role": "staff", "department": {"operator": "neq", "value": None}})
-                
-                for dept_data in departments:
-                    dept = dept_data["department"]
-                    if dept:
-                        dept_staff = get_data("profiles", {"department": dept, "role": "staff"})
-                        staff_ids = [s["id"] for s in dept_staff]
-                        
-                        if staff_ids:
-                            assignments = get_data("issue_assignments", {"staff_id": staff_ids})
-                            dept_issue_ids = list(set([a["issue_id"] for a in assignments]))
-                            stats["issues_by_department"][dept] = len(dept_issue_ids)
-                        else:
-                            stats["issues_by_department"][dept] = 0
+                dept_counts = execute_rpc("issues_per_department", {}) or []
+                stats["issues_by_department"] = {
+                    row["department"]: row["cnt"] for row in dept_counts
+                }
             
             return stats
             
         except Exception as e:
-            logger.error(f"Failed to get issue statistics: {str(e)}")
+            logger.error(f"Failed to compute issue statistics: {str(e)}")
             raise
     
     @staticmethod
@@ -415,59 +447,21 @@ class IssuesService:
             end_date = datetime.now()
             start_date = end_date - timedelta(days=days)
             
-            # Get recent votes
-            recent_votes = get_data("issue_votes", {
-                "created_at": {"operator": "gte", "value": start_date.isoformat()}
-            })
-            
-            # Count votes per issue
-            vote_counts = {}
-            for vote in recent_votes:
-                issue_id = vote["issue_id"]
-                vote_counts[issue_id] = vote_counts.get(issue_id, 0) + 1
-            
-            # Get recent updates
-            recent_updates = get_data("issue_updates", {
-                "created_at": {"operator": "gte", "value": start_date.isoformat()}
-            })
-            
-            # Count updates per issue
-            update_counts = {}
-            for update in recent_updates:
-                issue_id = update["issue_id"]
-                update_counts[issue_id] = update_counts.get(issue_id, 0) + 1
-            
-            # Calculate trending score (votes + updates)
-            trending_scores = {}
-            all_issue_ids = set(list(vote_counts.keys()) + list(update_counts.keys()))
-            
-            for issue_id in all_issue_ids:
-                score = vote_counts.get(issue_id, 0) * 2 + update_counts.get(issue_id, 0)  # Votes weighted more
-                trending_scores[issue_id] = score
-            
-            # Get top trending issues
-            top_issue_ids = sorted(trending_scores.keys(), 
-                                 key=lambda x: trending_scores[x], 
-                                 reverse=True)[:limit]
-            
-            if not top_issue_ids:
-                return []
-            
-            # Get issue details
+            # Scores are maintained by database triggers. The explicit NOT NULL matches the
+            # partial index on trending_score, so this is an indexed top-N read
             trending_issues = get_data(
                 "issues",
-                {"id": top_issue_ids},
-                select_fields="*, profiles!citizen_id(full_name)"
+                {
+                    "trending_updated_at": {"operator": "gte", "value": start_date.isoformat()},
+                    "trending_score": {"operator": "not.is", "value": "null"}
+                },
+                select_fields="*, trending_now, profiles!citizen_id(full_name)",
+                order_by="-trending_score",
+                limit=limit
             )
             
-            # Add trending score to each issue
             for issue in trending_issues:
-                issue["trending_score"] = trending_scores[issue["id"]]
-                issue["recent_votes"] = vote_counts.get(issue["id"], 0)
-                issue["recent_updates"] = update_counts.get(issue["id"], 0)
-            
-            # Sort by trending score
-            trending_issues.sort(key=lambda x: x["trending_score"], reverse=True)
+                issue["trending_score"] = round(issue.pop("trending_now") or 0, 2)
             
             return trending_issues
             
@@ -495,14 +489,14 @@ class IssuesService:
             user_issues = get_data("issues", {
                 "citizen_id": user_id,
                 "created_at": {"operator": "gte", "value": start_date.isoformat()}
-            })
+            }, select_fields="id")
             activity["issues_created"] = len(user_issues)
             
             # Votes cast by user
             user_votes = get_data("issue_votes", {
                 "user_id": user_id,
                 "created_at": {"operator": "gte", "value": start_date.isoformat()}
-            })
+            }, select_fields="issue_id")
             activity["votes_cast"] = len(user_votes)
             
             # Updates received on user's issues
@@ -511,7 +505,7 @@ class IssuesService:
                 updates_on_user_issues = get_data("issue_updates", {
                     "issue_id": user_issue_ids,
                     "created_at": {"operator": "gte", "value": start_date.isoformat()}
-                })
+                }, select_fields="id")
                 activity["updates_received"] = len(updates_on_user_issues)
             
             # Issues resolved
@@ -519,33 +513,28 @@ class IssuesService:
                 "citizen_id": user_id,
                 "status": "resolved",
                 "updated_at": {"operator": "gte", "value": start_date.isoformat()}
-            })
+            }, select_fields="id")
             activity["issues_resolved"] = len(resolved_issues)
             
-            # Recent activity timeline
-            recent_activity = []
-            
-            # Add created issues
-            for issue in user_issues[-5:]:  # Last 5
-                recent_activity.append({
-                    "type": "issue_created",
-                    "timestamp": issue["created_at"],
-                    "description": f"Created issue: {issue['title']}",
-                    "issue_id": issue["id"]
-                })
-            
-            # Add votes
-            for vote in user_votes[-5:]:  # Last 5
-                recent_activity.append({
-                    "type": "vote_cast",
-                    "timestamp": vote["created_at"],
-                    "description": f"Voted on issue #{vote['issue_id']}",
-                    "issue_id": vote["issue_id"]
-                })
-            
-            # Sort by timestamp
-            recent_activity.sort(key=lambda x: x["timestamp"], reverse=True)
-            activity["recent_activity"] = recent_activity[:10]  # Top 10
+            # Recent activity timeline, merged and ordered in the database
+            recent_rows = execute_rpc("user_activity", {
+                "uid": user_id,
+                "since": start_date.isoformat(),
+                "lim": 10
+            }) or []
+            
+            activity["recent_activity"] = [
+                {
+                    "type": row["type"],
+                    "timestamp": row["ts"],
+                    "description": (
+                        f"Created issue: {row['title']}" if row["type"] == "issue_created"
+                        else f"Voted on issue #{row['issue_id']}"
+                    ),
+                    "issue_id": row["issue_id"]
+                }
+                for row in recent_rows
+            ]
             
             return activity
             
@@ -571,30 +560,22 @@ class IssuesService:
                 "errors": []
             }
             
+            if not issue_ids:
+                return results
+            
+            # Single UPDATE ... WHERE id IN (...); missing ids are simply not returned
+            update_data_dict = {
+                "status": new_status,
+                "updated_at": datetime.now().isoformat()
+            }
+            updated = update_data("issues", {"id": list(issue_ids)}, update_data_dict)
+            _invalidate_issue_cache(*issue_ids)
+            updated_ids = {issue["id"] for issue in updated}
+            
+            results["processed"] = len(updated_ids)
             for issue_id in issue_ids:
-                try:
-                    # Check if issue exists
-                    existing_issue = IssuesService.get_issue_by_id(issue_id, include_citizen_info=False)
-                    if not existing_issue:
-                        results["errors"].append(f"Issue {issue_id} not found")
-                        results["failed"] += 1
-                        continue
-                    
-                    # Update status
-                    update_data_dict = {
-                        "status": new_status,
-                        "updated_at": datetime.now().isoformat()
-                    }
-                    
-                    updated = update_data("issues", {"id": issue_id}, update_data_dict)
-                    if updated:
-                        results["processed"] += 1
-                    else:
-                        results["errors"].append(f"Failed to update issue {issue_id}")
-                        results["failed"] += 1
-                        
-                except Exception as e:
-                    results["errors"].append(f"Issue {issue_id}: {str(e)}")
+                if issue_id not in updated_ids:
+                    results["errors"].append(f"Issue {issue_id} not found")
                     results["failed"] += 1
             
             logger.info(f"Bulk status update: {results['processed']} processed, {results['failed']} failed by {user_id}")
@@ -639,32 +620,30 @@ class IssuesService:
             
             # Combine and deduplicate
             priority_issues = []
-            seen_ids = set()
+            days_old_by_id = {}
+            now = datetime.now(timezone.utc)
             
             # Add high upvote issues first
             for issue in high_upvote_issues:
-                if issue["id"] not in seen_ids:
+                if issue["id"] not in days_old_by_id:
+                    days_old_by_id[issue["id"]] = (now - _parse_timestamp(issue["created_at"])).days
                     issue["priority_reason"] = f"High upvotes ({issue.get('upvotes', 0)})"
                     priority_issues.append(issue)
-                    seen_ids.add(issue["id"])
             
             # Add old pending issues
             for issue in old_pending_issues:
-                if issue["id"] not in seen_ids:
-                    created_date = datetime.fromisoformat(issue["created_at"].replace("Z", "+00:00"))
-                    days_old = (datetime.now().replace(tzinfo=created_date.tzinfo) - created_date).days
+                if issue["id"] not in days_old_by_id:
+                    days_old = (now - _parse_timestamp(issue["created_at"])).days
+                    days_old_by_id[issue["id"]] = days_old
                     issue["priority_reason"] = f"Pending for {days_old} days"
                     priority_issues.append(issue)
-                    seen_ids.add(issue["id"])
             
             # Sort by priority score (upvotes + age factor)
             for issue in priority_issues:
                 upvotes = issue.get("upvotes", 0)
-                created_date = datetime.fromisoformat(issue["created_at"].replace("Z", "+00:00"))
-                days_old = (datetime.now().replace(tzinfo=created_date.tzinfo) - created_date).days
                 
                 # Priority score: upvotes + (days_old * 0.5)
-                issue["priority_score"] = upvotes + (days_old * 0.5)
+                issue["priority_score"] = upvotes + (days_old_by_id[issue["id"]] * 0.5)
             
             priority_issues.sort(key=lambda x: x.get("priority_score", 0), reverse=True)
             
@@ -682,70 +661,33 @@ class IssuesService:
             if category not in valid_categories:
                 raise ValueError(f"Invalid category. Must be one of: {valid_categories}")
             
-            # Calculate date range
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=days)
-            
-            # Get category issues
-            category_issues = get_data("issues", {"category": category})
-            recent_issues = get_data("issues", {
-                "category": category,
-                "created_at": {"operator": "gte", "value": start_date.isoformat()}
-            })
-            
-            # Basic statistics
-            total_issues = len(category_issues)
-            recent_count = len(recent_issues)
-            pending_count = len([i for i in category_issues if i["status"] == "pending"])
-            resolved_count = len([i for i in category_issues if i["status"] == "resolved"])
-            
-            # Calculate average resolution time
-            resolved_issues = [i for i in category_issues if i["status"] == "resolved"]
-            avg_resolution_days = None
-            
-            if resolved_issues:
-                total_days = 0
-                count = 0
-                
-                for issue in resolved_issues:
-                    try:
-                        created_at = datetime.fromisoformat(issue["created_at"].replace("Z", "+00:00"))
-                        updated_at = datetime.fromisoformat(issue["updated_at"].replace("Z", "+00:00"))
-                        resolution_days = (updated_at - created_at).days
-                        total_days += resolution_days
-                        count += 1
-                    except Exception:
-                        continue
-                
-                if count > 0:
-                    avg_resolution_days = round(total_days / count, 1)
-            
-            # Top locations (if available)
-            locations = {}
-            for issue in category_issues:
-                if issue.get("latitude") and issue.get("longitude"):
-                    # Simple location clustering (you might want more sophisticated clustering)
-                    lat_rounded = round(issue["latitude"], 2)
-                    lng_rounded = round(issue["longitude"], 2)
-                    location_key = f"{lat_rounded},{lng_rounded}"
-                    
-                    if location_key not in locations:
-                        locations[location_key] = {
-                            "lat": lat_rounded,
-                            "lng": lng_rounded,
-                            "count": 0
-                        }
-                    locations[location_key]["count"] += 1
-            
-            top_locations = sorted(
-                locations.values(),
-                key=lambda x: x["count"],
-                reverse=True
-            )[:5]
+            cache_key = (category, days)
+            with _insights_cache_lock:
+                cached = _insights_cache.get(cache_key)
+            if cached is not None:
+                return copy.deepcopy(cached)
+            
+            # Counts, upvotes, resolution time and top locations in one query
+            rows = execute_rpc("category_insights", {"cat": category, "days": days})
+            row = rows[0] if rows else {}
+            
+            total_issues = row.get("total") or 0
+            recent_count = row.get("recent") or 0
+            pending_count = row.get("pending") or 0
+            resolved_count = row.get("resolved") or 0
+            total_upvotes = row.get("sum_upvotes") or 0
+            avg_resolution_days = row.get("avg_resolution_days")
+            if avg_resolution_days is not None:
+                avg_resolution_days = float(avg_resolution_days)
+            
+            top_locations = [
+                {"lat": float(loc["lat"]), "lng": float(loc["lng"]), "count": loc["count"]}
+                for loc in row.get("top_locations") or []
+            ]
             
             # Trend analysis (simplified)
             trend = "stable"
-            if len(category_issues) > 0:
+            if total_issues > 0:
                 recent_percentage = (recent_count / total_issues) * 100
                 if recent_percentage > 50:
                     trend = "increasing"
@@ -763,11 +705,13 @@ class IssuesService:
                 "avg_resolution_days": avg_resolution_days,
                 "trend": trend,
                 "top_locations": top_locations,
-                "total_upvotes": sum(issue.get("upvotes", 0) for issue in category_issues),
-                "avg_upvotes": round(sum(issue.get("upvotes", 0) for issue in category_issues) / total_issues, 1) if total_issues > 0 else 0
+                "total_upvotes": total_upvotes,
+                "avg_upvotes": round(total_upvotes / total_issues, 1) if total_issues > 0 else 0
             }
             
-            return insights
+            with _insights_cache_lock:
+                _insights_cache[cache_key] = insights
+            return copy.deepcopy(insights)
             
         except Exception as e:
             logger.error(f"Failed to get category insights for {category}: {str(e)}")
@@ -778,11 +722,17 @@ class IssuesService:
                             format: str = "summary") -> Dict[str, Any]:
         """Generate comprehensive issue report."""
         try:
+            # Summary reports only aggregate; fetch full rows only when they are returned
+            if format == "detailed":
+                select_fields = "*, profiles!citizen_id(full_name, phone)"
+            else:
+                select_fields = "status, category, upvotes, latitude, longitude"
+            
             # Get issues based on filters
             issues = get_data(
                 "issues",
                 filters=filters,
-                select_fields="*, profiles!citizen_id(full_name, phone)"
+                select_fields=select_fields
             )
             
             if not issues:
@@ -797,24 +747,18 @@ class IssuesService:
             status_counts = {"pending": 0, "in_progress": 0, "resolved": 0}
             category_counts = {"potholes": 0, "DamagedElectricalPoles": 0, "Garbage": 0, "WaterLogging": 0, "FallenTrees": 0}
             
-            total_upvotes = 0
-            issues_with_location = 0
+            # Count by status and category (Counter tallies in C)
+            status_counts.update(Counter(map(itemgetter("status"), issues)))
+            category_counts.update(Counter(map(itemgetter("category"), issues)))
             
-            for issue in issues:
-                # Count by status
-                status = issue.get("status", "pending")
-                status_counts[status] = status_counts.get(status, 0) + 1
-                
-                # Count by category
-                category = issue.get("category", "other")
-                category_counts[category] = category_counts.get(category, 0) + 1
-                
-                # Count upvotes
-                total_upvotes += issue.get("upvotes", 0)
-                
-                # Count issues with location
-                if issue.get("latitude") and issue.get("longitude"):
-                    issues_with_location += 1
+            # Count upvotes
+            total_upvotes = sum(upvotes or 0 for upvotes in map(itemgetter("upvotes"), issues))
+            
+            # Count issues with location
+            issues_with_location = sum(
+                1 for latitude, longitude in map(itemgetter("latitude", "longitude"), issues)
+                if latitude and longitude
+            )
             
             # Calculate resolution rate
             resolution_rate = round((status_counts["resolved"] / total_issues) * 100, 1) if total_issues > 0 else 0
@@ -842,20 +786,13 @@ class IssuesService:
             if format == "detailed":
                 # Add detailed analysis
                 report["detailed_analysis"] = {
-                    "top_categories": sorted(
-                        category_counts.items(),
-                        key=lambda x: x[1],
-                        reverse=True
-                    )[:3],
-                    "issues_needing_attention": [
-                        issue for issue in issues
-                        if issue["status"] == "pending" and issue.get("upvotes", 0) >= 5
-                    ][:10],
-                    "recent_issues": sorted(
-                        issues,
-                        key=lambda x: x["created_at"],
-                        reverse=True
-                    )[:5]
+                    "top_categories": heapq.nlargest(3, category_counts.items(), key=itemgetter(1)),
+                    "issues_needing_attention": list(islice(
+                        (issue for issue in issues
+                         if issue["status"] == "pending" and (issue["upvotes"] or 0) >= 5),
+                        10
+                    )),
+                    "recent_issues": heapq.nlargest(5, issues, key=itemgetter("created_at"))
                 }
             
             return report
@@ -869,11 +806,11 @@ class IssuesService:
                              citizen_id: str, threshold: float = 0.7) -> List[Dict[str, Any]]:
         """Check for potential duplicate issues using simple text similarity."""
         try:
-            # Get recent issues from the same citizen
+            # Get recent issues from the same citizen (only the compared text)
             recent_issues = get_data("issues", {
                 "citizen_id": citizen_id,
                 "created_at": {"operator": "gte", "value": (datetime.now() - timedelta(days=30)).isoformat()}
-            })
+            }, select_fields="id, title, description")
             
             potential_duplicates = []
             
@@ -885,9 +822,17 @@ class IssuesService:
                 issue_title_words = set(issue["title"].lower().split())
                 issue_desc_words = set(issue["description"].lower().split())
                 
+                # Skip candidates whose set sizes alone rule out the threshold
+                best_possible = (
+                    _jaccard_upper_bound(len(title_words), len(issue_title_words)) * 0.6
+                    + _jaccard_upper_bound(len(desc_words), len(issue_desc_words)) * 0.4
+                )
+                if best_possible < threshold:
+                    continue
+                
                 # Calculate Jaccard similarity for title and description
-                title_similarity = len(title_words.intersection(issue_title_words)) / len(title_words.union(issue_title_words))
-                desc_similarity = len(desc_words.intersection(issue_desc_words)) / len(desc_words.union(issue_desc_words))
+                title_similarity = _jaccard(title_words, issue_title_words)
+                desc_similarity = _jaccard(desc_words, issue_desc_words)
                 
                 # Combined similarity score
                 combined_similarity = (title_similarity * 0.6) + (desc_similarity * 0.4)
@@ -896,10 +841,20 @@ class IssuesService:
                     issue["similarity_score"] = round(combined_similarity, 2)
                     potential_duplicates.append(issue)
             
-            # Sort by similarity score
-            potential_duplicates.sort(key=lambda x: x["similarity_score"], reverse=True)
+            # Top 5 potential duplicates by similarity score
+            top_matches = heapq.nlargest(5, potential_duplicates, key=itemgetter("similarity_score"))
+            if not top_matches:
+                return []
             
-            return potential_duplicates[:5]  # Return top 5 potential duplicates
+            # Full records only for the survivors
+            full_by_id = {
+                issue["id"]: issue
+                for issue in get_data("issues", {"id": [match["id"] for match in top_matches]})
+            }
+            return [
+                {**full_by_id[match["id"]], "similarity_score": match["similarity_score"]}
+                for match in top_matches if match["id"] in full_by_id
+            ]
             
         except Exception as e:
             logger.error(f"Failed to check for duplicate issues: {str(e)}")
@@ -913,44 +868,32 @@ class IssuesService:
             # Calculate cutoff date
             cutoff_date = datetime.now() - timedelta(days=days_threshold)
             
-            # Find old resolved issues
-            old_issues = get_data("issues", {
+            # Flag every old resolved issue in a single UPDATE
+            # In a real implementation, you might move to an archive table
+            archived = update_data("issues", {
                 "status": "resolved",
                 "updated_at": {"operator": "lte", "value": cutoff_date.isoformat()}
+            }, {
+                "archived": True,
+                "archived_at": datetime.now().isoformat(),
+                "archived_by": user_id
             })
             
-            if not old_issues:
+            if not archived:
                 return {
                     "archived_count": 0,
                     "message": "No issues found for archiving"
                 }
             
-            archived_count = 0
-            errors = []
-            
-            for issue in old_issues:
-                try:
-                    # In a real implementation, you might move to an archive table
-                    # For now, we'll just add an archived flag
-                    update_data("issues", {"id": issue["id"]}, {
-                        "archived": True,
-                        "archived_at": datetime.now().isoformat(),
-                        "archived_by": user_id
-                    })
-                    archived_count += 1
-                    
-                except Exception as e:
-                    errors.append(f"Failed to archive issue {issue['id']}: {str(e)}")
+            _invalidate_issue_cache(*(issue["id"] for issue in archived))
             
+            archived_count = len(archived)
             result = {
                 "archived_count": archived_count,
-                "total_candidates": len(old_issues),
+                "total_candidates": archived_count,
                 "cutoff_date": cutoff_date.isoformat()
             }
             
-            if errors:
-                result["errors"] = errors
-            
             logger.info(f"Archived {archived_count} issues older than {days_threshold} days")
             return result
             
@@ -1,10 +1,71 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from cachetools import TTLCache
+from collections import defaultdict
+import os
+import threading
 import logging
-from datetime import datetime
-from app.supabase_client import insert_data, get_data
+from datetime import datetime, timezone
+from app.supabase_client import insert_data, get_data, update_data
 
 logger = logging.getLogger(__name__)
 
+# Set NOTIFICATIONS_ENABLED=true once the notifications table exists; until then
+# notification records are skipped entirely
+NOTIFICATIONS_ENABLED = os.getenv("NOTIFICATIONS_ENABLED", "").lower() in ("1", "true", "yes")
+logger.info(f"Notification records {'enabled' if NOTIFICATIONS_ENABLED else 'disabled'}")
+
+# Rows per INSERT when creating notifications in bulk (keeps PostgREST payloads small)
+NOTIFICATION_BATCH_SIZE = 1000
+
+# Notification recipients: (role, ...) or ("supervisor", "department", dept) -> profile rows
+_role_cache: TTLCache = TTLCache(maxsize=512, ttl=60)
+_role_cache_lock = threading.Lock()
+
+
+def invalidate_role_cache() -> None:
+    """Drop cached recipient rosters after a profile's role or department changes."""
+    with _role_cache_lock:
+        _role_cache.clear()
+
+
+def _get_profiles_by_role(*roles: str) -> List[Dict[str, Any]]:
+    """Fetch profiles with any of the given roles, cached for up to 60 seconds."""
+    key: Tuple[str, ...] = tuple(sorted(roles))
+    with _role_cache_lock:
+        cached = _role_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    profiles = get_data("profiles", {"role": list(key)})
+    with _role_cache_lock:
+        _role_cache[key] = profiles
+    return profiles
+
+
+def _get_supervisors_by_department(departments: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """Map each department to its supervisors, fetching uncached departments in one query."""
+    result: Dict[str, List[Dict[str, Any]]] = {}
+    missing = []
+    with _role_cache_lock:
+        for dept in departments:
+            cached = _role_cache.get(("supervisor", "department", dept))
+            if cached is None:
+                missing.append(dept)
+            else:
+                result[dept] = cached
+    
+    if missing:
+        fetched = {dept: [] for dept in missing}
+        for supervisor in get_data("profiles", {"role": "supervisor", "department": missing},
+                                   select_fields="id, department"):
+            fetched[supervisor["department"]].append(supervisor)
+        with _role_cache_lock:
+            for dept, supervisors in fetched.items():
+                _role_cache[("supervisor", "department", dept)] = supervisors
+        result.update(fetched)
+    
+    return result
+
 
 class NotificationService:
     """Service for handling notifications and communications."""
@@ -14,7 +75,7 @@ class NotificationService:
         """Notify when a new issue is created."""
         try:
             # Log notification (replace with actual notification logic)
-            logger.info(f"Issue created notification: '{issue['title']}' by {citizen.get('full_name', 'Unknown')}")
+            logger.info("Issue created notification: '%s' by %s", issue['title'], citizen.get('full_name', 'Unknown'))
             
             # Create notification record
             notification_data = {
@@ -59,7 +120,7 @@ class NotificationService:
                             staff: Dict[str, Any]) -> bool:
         """Notify when an issue is assigned to staff."""
         try:
-            logger.info(f"Issue assigned notification: '{issue['title']}' assigned to {staff.get('full_name', 'Unknown')}")
+            logger.info("Issue assigned notification: '%s' assigned to %s", issue['title'], staff.get('full_name', 'Unknown'))
             
             # Notify staff member
             staff_notification = {
@@ -111,7 +172,7 @@ class NotificationService:
                            citizen: Dict[str, Any]) -> bool:
         """Notify when an issue receives an update."""
         try:
-            logger.info(f"Issue update notification: '{issue['title']}' updated")
+            logger.info("Issue update notification: '%s' updated", issue['title'])
             
             # Notify citizen about the update
             citizen_notification = {
@@ -144,7 +205,7 @@ class NotificationService:
     def notify_issue_resolved(issue: Dict[str, Any], citizen: Dict[str, Any]) -> bool:
         """Notify when an issue is resolved."""
         try:
-            logger.info(f"Issue resolved notification: '{issue['title']}' resolved")
+            logger.info("Issue resolved notification: '%s' resolved", issue['title'])
             
             # Notify citizen about resolution
             citizen_notification = {
@@ -176,16 +237,18 @@ class NotificationService:
     def notify_high_priority_issue(issue: Dict[str, Any], reason: str) -> bool:
         """Notify about high priority issues that need immediate attention."""
         try:
-            logger.warning(f"High priority issue notification: '{issue['title']}' - {reason}")
+            logger.warning("High priority issue notification: '%s' - %s", issue['title'], reason)
             
             # Get all supervisors and admins
-            supervisors = get_data("profiles", {"role": ["supervisor", "admin"]})
+            supervisors = _get_profiles_by_role("supervisor", "admin")
             
-            for supervisor in supervisors:
-                notification_data = {
+            # Every recipient gets the same text; build it once
+            message = f"Urgent attention needed for issue: {issue['title']}. Reason: {reason}"
+            rows = [
+                {
                     "user_id": supervisor["id"],
                     "title": "High Priority Issue Alert",
-                    "message": f"Urgent attention needed for issue: {issue['title']}. Reason: {reason}",
+                    "message": message,
                     "type": "warning",
                     "metadata": {
                         "issue_id": issue["id"],
@@ -193,8 +256,10 @@ class NotificationService:
                         "action": "high_priority_alert"
                     }
                 }
-                
-                NotificationService._create_notification(notification_data)
+                for supervisor in supervisors
+            ]
+            
+            NotificationService._create_notifications_bulk(rows)
             
             return True
             
@@ -209,91 +274,107 @@ class NotificationService:
             if not overdue_issues:
                 return True
             
-            logger.info(f"Overdue issues notification: {len(overdue_issues)} issues overdue")
+            logger.info("Overdue issues notification: %d issues overdue", len(overdue_issues))
             
-            # Group issues by assigned staff
-            staff_issues = {}
-            for issue in overdue_issues:
-                assignments = get_data("issue_assignments", {"issue_id": issue["id"], "status": ["assigned", "in_progress"]})
-                
-                for assignment in assignments:
-                    staff_id = assignment["staff_id"]
-                    if staff_id not in staff_issues:
-                        staff_issues[staff_id] = []
-                    staff_issues[staff_id].append(issue)
-            
-            # Notify each staff member about their overdue issues
-            for staff_id, issues in staff_issues.items():
-                issue_titles = [issue["title"] for issue in issues[:3]]  # Show first 3
-                more_count = len(issues) - 3 if len(issues) > 3 else 0
-                
-                message = f"You have {len(issues)} overdue issue(s): {', '.join(issue_titles)}"
-                if more_count > 0:
-                    message += f" and {more_count} more"
-                
+            # Flush rows in batches as they are produced instead of buffering them all
+            batch = []
+            for notification_data in NotificationService._iter_overdue_notifications(overdue_issues):
+                batch.append(notification_data)
+                if len(batch) >= NOTIFICATION_BATCH_SIZE:
+                    NotificationService._create_notifications_bulk(batch)
+                    batch = []
+            
+            NotificationService._create_notifications_bulk(batch)
+            
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to send overdue issues notification: {str(e)}")
+            return False
+    
+    @staticmethod
+    def _iter_overdue_notifications(overdue_issues: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Yield the staff and supervisor notification rows for overdue issues."""
+        # Group issues by assigned staff
+        active_assignments = get_data(
+            "issue_assignments",
+            {"issue_id": [issue["id"] for issue in overdue_issues], "status": ["assigned", "in_progress"]},
+            select_fields="issue_id, staff_id"
+        )
+        assignments_by_issue = defaultdict(list)
+        for assignment in active_assignments:
+            assignments_by_issue[assignment["issue_id"]].append(assignment)
+        
+        staff_issues = defaultdict(list)
+        for issue in overdue_issues:
+            for assignment in assignments_by_issue.get(issue["id"], ()):
+                staff_issues[assignment["staff_id"]].append(issue)
+        
+        # Notify each staff member about their overdue issues
+        for staff_id, issues in staff_issues.items():
+            issue_titles = [issue["title"] for issue in issues[:3]]  # Show first 3
+            more_count = len(issues) - 3 if len(issues) > 3 else 0
+            
+            message = f"You have {len(issues)} overdue issue(s): {', '.join(issue_titles)}"
+            if more_count > 0:
+                message += f" and {more_count} more"
+            
+            notification_data = {
+                "user_id": staff_id,
+                "title": "Overdue Issues Alert",
+                "message": message,
+                "type": "warning",
+                "metadata": {
+                    "overdue_count": len(issues),
+                    "issue_ids": [issue["id"] for issue in issues],
+                    "action": "overdue_issues"
+                }
+            }
+            
+            yield notification_data
+        
+        # Notify supervisors about department overdue issues
+        departments = defaultdict(int)
+        staff_rows = get_data("profiles", {"id": list(staff_issues.keys())},
+                              select_fields="id, department") if staff_issues else []
+        staff_dept = {row["id"]: row.get("department") for row in staff_rows}
+        for staff_id, issues in staff_issues.items():
+            dept = staff_dept.get(staff_id)
+            if dept:
+                departments[dept] += len(issues)
+        
+        supervisors_by_dept = _get_supervisors_by_department(list(departments.keys()))
+        
+        for dept, count in departments.items():
+            message = f"Your department has {count} overdue issue(s) requiring attention."
+            for supervisor in supervisors_by_dept.get(dept, []):
                 notification_data = {
-                    "user_id": staff_id,
-                    "title": "Overdue Issues Alert",
+                    "user_id": supervisor["id"],
+                    "title": "Department Overdue Issues",
                     "message": message,
                     "type": "warning",
                     "metadata": {
-                        "overdue_count": len(issues),
-                        "issue_ids": [issue["id"] for issue in issues],
-                        "action": "overdue_issues"
+                        "department": dept,
+                        "overdue_count": count,
+                        "action": "department_overdue"
                     }
                 }
                 
-                NotificationService._create_notification(notification_data)
-            
-            # Notify supervisors about department overdue issues
-            departments = {}
-            for staff_id in staff_issues.keys():
-                staff_data = get_data("profiles", {"id": staff_id})
-                if staff_data and staff_data[0].get("department"):
-                    dept = staff_data[0]["department"]
-                    if dept not in departments:
-                        departments[dept] = 0
-                    departments[dept] += len(staff_issues[staff_id])
-            
-            for dept, count in departments.items():
-                supervisors = get_data("profiles", {"role": "supervisor", "department": dept})
-                
-                for supervisor in supervisors:
-                    notification_data = {
-                        "user_id": supervisor["id"],
-                        "title": "Department Overdue Issues",
-                        "message": f"Your department has {count} overdue issue(s) requiring attention.",
-                        "type": "warning",
-                        "metadata": {
-                            "department": dept,
-                            "overdue_count": count,
-                            "action": "department_overdue"
-                        }
-                    }
-                    
-                    NotificationService._create_notification(notification_data)
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to send overdue issues notification: {str(e)}")
-            return False
+                yield notification_data
     
     @staticmethod
     def _create_notification(notification_data: Dict[str, Any]) -> bool:
         """Create a notification record in the database."""
+        if not NOTIFICATIONS_ENABLED:
+            return True
+        
         try:
             # Add timestamp
-            notification_data["created_at"] = datetime.now().isoformat()
+            notification_data["created_at"] = datetime.now(timezone.utc).isoformat()
             notification_data["is_read"] = False
             
-            # If notifications table exists, insert the notification
-            # For now, we'll just log it since the table might not exist
-            logger.info(f"Notification created: {notification_data['title']} for user {notification_data['user_id']}")
-            
-            # Uncomment this if you have a notifications table:
-            # result = insert_data("notifications", notification_data)
-            # return bool(result)
+            insert_data("notifications", notification_data, returning="minimal")
+            logger.info("Notification created: %s for user %s", notification_data['title'], notification_data['user_id'])
             
             return True
             
@@ -301,21 +382,54 @@ class NotificationService:
             logger.error(f"Failed to create notification: {str(e)}")
             return False
     
+    @staticmethod
+    def _create_notifications_bulk(rows: List[Dict[str, Any]]) -> int:
+        """Create many notification records with one insert per batch."""
+        if not NOTIFICATIONS_ENABLED:
+            return len(rows)
+        
+        try:
+            if not rows:
+                return 0
+            
+            # Add timestamp (once for the whole batch)
+            created_at = datetime.now(timezone.utc).isoformat()
+            for row in rows:
+                row["created_at"] = created_at
+                row["is_read"] = False
+            
+            created_count = 0
+            for start in range(0, len(rows), NOTIFICATION_BATCH_SIZE):
+                batch = rows[start:start + NOTIFICATION_BATCH_SIZE]
+                
+                # Rows are not read back; a failed insert raises
+                insert_data("notifications", batch, returning="minimal")
+                created_count += len(batch)
+                logger.info("Notifications created: %s for %d users", batch[0]['title'], len(batch))
+            
+            return created_count
+            
+        except Exception as e:
+            logger.error(f"Failed to create notifications: {str(e)}")
+            return 0
+    
     @staticmethod
     def _notify_supervisors_of_new_issue(issue: Dict[str, Any]) -> bool:
         """Notify supervisors about new issues in their area of responsibility."""
         try:
             # Get all supervisors
-            supervisors = get_data("profiles", {"role": "supervisor"})
+            supervisors = _get_profiles_by_role("supervisor")
             
-            for supervisor in supervisors:
-                # You could implement logic to determine which supervisors should be notified
-                # based on issue category, location, department, etc.
-                
-                notification_data = {
+            # Every recipient gets the same text; build it once
+            message = f"A new {issue.get('category', 'general')} issue has been reported: {issue['title']}"
+            
+            # You could implement logic to determine which supervisors should be notified
+            # based on issue category, location, department, etc.
+            rows = [
+                {
                     "user_id": supervisor["id"],
                     "title": "New Issue Reported",
-                    "message": f"A new {issue.get('category', 'general')} issue has been reported: {issue['title']}",
+                    "message": message,
                     "type": "info",
                     "metadata": {
                         "issue_id": issue["id"],
@@ -323,8 +437,10 @@ class NotificationService:
                         "action": "new_issue_supervisor"
                     }
                 }
-                
-                NotificationService._create_notification(notification_data)
+                for supervisor in supervisors
+            ]
+            
+            NotificationService._create_notifications_bulk(rows)
             
             return True
             
@@ -341,13 +457,10 @@ class NotificationService:
             if unread_only:
                 filters["is_read"] = False
             
-            # This would work if you have a notifications table
-            # notifications = get_data("notifications", filters=filters, order_by="-created_at", limit=limit)
-            # return notifications
+            if not NOTIFICATIONS_ENABLED:
+                return []
             
-            # For now, return empty list since notifications table doesn't exist
-            logger.info(f"Fetching notifications for user {user_id}")
-            return []
+            return get_data("notifications", filters=filters, order_by="-created_at", limit=limit)
             
         except Exception as e:
             logger.error(f"Failed to get notifications for user {user_id}: {str(e)}")
@@ -357,15 +470,13 @@ class NotificationService:
     def mark_notification_read(notification_id: int, user_id: str) -> bool:
         """Mark a notification as read."""
         try:
-            # This would work if you have a notifications table
-            # result = update_data("notifications", 
-            #                     {"id": notification_id, "user_id": user_id}, 
-            #                     {"is_read": True, "read_at": datetime.now().isoformat()})
-            # return bool(result)
+            if not NOTIFICATIONS_ENABLED:
+                return True
             
-            # For now, just log it
-            logger.info(f"Marking notification {notification_id} as read for user {user_id}")
-            return True
+            result = update_data("notifications", 
+                                {"id": notification_id, "user_id": user_id}, 
+                                {"is_read": True, "read_at": datetime.now(timezone.utc).isoformat()})
+            return bool(result)
             
         except Exception as e:
             logger.error(f"Failed to mark notification as read: {str(e)}")
@@ -376,21 +487,20 @@ class NotificationService:
                               notification_type: str = "info", metadata: Optional[Dict[str, Any]] = None) -> int:
         """Send notification to multiple users."""
         try:
-            success_count = 0
-            
-            for user_id in user_ids:
-                notification_data = {
+            rows = [
+                {
                     "user_id": user_id,
                     "title": title,
                     "message": message,
                     "type": notification_type,
                     "metadata": metadata or {}
                 }
-                
-                if NotificationService._create_notification(notification_data):
-                    success_count += 1
+                for user_id in user_ids
+            ]
+            
+            success_count = NotificationService._create_notifications_bulk(rows)
             
-            logger.info(f"Bulk notification sent to {success_count}/{len(user_ids)} users")
+            logger.info("Bulk notification sent to %d/%d users", success_count, len(user_ids))
             return success_count
             
         except Exception as e:
@@ -1,16 +1,51 @@
 import uuid
 import hashlib
+import hmac
 import secrets
+import string
 import re
 import os
+from collections import Counter
 from datetime import datetime, timedelta
 from typing import Optional, Any, Dict, List, Union, Tuple
 from PIL import Image
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerifyMismatchError
 from io import BytesIO
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Precompiled patterns for the validation and text helpers below
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_PHONE_CLEAN_RE = re.compile(r'[\s\-\(\)]')
+_PHONE_RE = re.compile(r'^\+?[\d]{10,15}$')
+# A run of tags and whitespace; group 1 is set when the run contains whitespace outside tags
+_TAGS_AND_WHITESPACE_RE = re.compile(r'((?:<[^>]+>)*\s(?:\s|<[^>]+>)*)|<[^>]+>')
+_WORD_RE = re.compile(r'\b[a-zA-Z]{3,}\b')
+_NON_DIGIT_RE = re.compile(r'\D')
+
+# Character classes and common passwords for validate_password
+_UPPERCASE_CHARS = frozenset(string.ascii_uppercase)
+_LOWERCASE_CHARS = frozenset(string.ascii_lowercase)
+_DIGIT_CHARS = frozenset(string.digits)
+_SPECIAL_CHARS = frozenset('!@#$%^&*(),.?":{}|<>')
+_WEAK_PASSWORDS = frozenset({"password", "123456", "qwerty", "abc123", "password123"})
+
+# Words ignored by extract_keywords
+_STOP_WORDS = frozenset({
+    'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
+    'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did',
+    'will', 'would', 'could', 'should', 'may', 'might', 'can', 'this', 'that', 'these', 'those'
+})
+
+# Byte -> ASCII digit table for generate_numeric_code
+_DIGIT_TABLE = bytes(0x30 + b % 10 for b in range(256))
+_BIASED_BYTES = bytes(range(250, 256))
+
+# Path separators and reserved characters rejected by is_safe_filename
+_UNSAFE_FILENAME_CHARS = frozenset('/\\<>:"|?*')
+
 
 def generate_uuid() -> str:
     """Generate a new UUID string."""
@@ -33,8 +68,7 @@ def validate_email(email: str) -> bool:
     if not email:
         return False
     
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, email.strip()))
+    return bool(_EMAIL_RE.match(email.strip()))
 
 
 def validate_phone(phone: str) -> bool:
@@ -43,11 +77,10 @@ def validate_phone(phone: str) -> bool:
         return False
     
     # Remove spaces, dashes, parentheses
-    cleaned_phone = re.sub(r'[\s\-\(\)]', '', phone)
+    cleaned_phone = _PHONE_CLEAN_RE.sub('', phone)
     
     # Check for international format or local format
-    pattern = r'^\+?[\d]{10,15}$'
-    return bool(re.match(pattern, cleaned_phone))
+    return bool(_PHONE_RE.match(cleaned_phone))
 
 
 def validate_password(password: str) -> Dict[str, Any]:
@@ -76,37 +109,38 @@ def validate_password(password: str) -> Dict[str, Any]:
     else:
         validation["feedback"].append("Password must be at least 8 characters long")
     
+    password_chars = set(password)
+    
     # Check for uppercase letter
-    if re.search(r'[A-Z]', password):
+    if not _UPPERCASE_CHARS.isdisjoint(password_chars):
         validation["requirements_met"]["has_uppercase"] = True
         validation["score"] += 1
     else:
         validation["feedback"].append("Password must contain at least one uppercase letter")
     
     # Check for lowercase letter
-    if re.search(r'[a-z]', password):
+    if not _LOWERCASE_CHARS.isdisjoint(password_chars):
         validation["requirements_met"]["has_lowercase"] = True
         validation["score"] += 1
     else:
         validation["feedback"].append("Password must contain at least one lowercase letter")
     
     # Check for digit
-    if re.search(r'\d', password):
+    if not _DIGIT_CHARS.isdisjoint(password_chars):
         validation["requirements_met"]["has_digit"] = True
         validation["score"] += 1
     else:
         validation["feedback"].append("Password must contain at least one number")
     
     # Check for special character
-    if re.search(r'[!@#$%^&*(),.?":{}|<>]', password):
+    if not _SPECIAL_CHARS.isdisjoint(password_chars):
         validation["requirements_met"]["has_special"] = True
         validation["score"] += 1
     else:
         validation["feedback"].append("Password must contain at least one special character")
     
     # Check for common weak passwords
-    weak_passwords = ["password", "123456", "qwerty", "abc123", "password123"]
-    if password.lower() in weak_passwords:
+    if password.lower() in _WEAK_PASSWORDS:
         validation["feedback"].append("Password is too common")
         validation["score"] = max(0, validation["score"] - 2)
     
@@ -136,19 +170,29 @@ def validate_image_file(file_content: bytes) -> bool:
 
 
 # Hashing and security functions
+# Argon2id with OWASP-recommended parameters; salt and parameters are encoded in the hash
+_password_hasher = PasswordHasher(time_cost=3, memory_cost=64 * 1024, parallelism=2,
+                                  hash_len=32, salt_len=16)
+
+
 def hash_password(password: str) -> str:
-    """Hash password using SHA-256 with salt."""
-    salt = secrets.token_hex(16)
-    password_hash = hashlib.sha256((password + salt).encode()).hexdigest()
-    return f"{salt}:{password_hash}"
+    """Hash password using Argon2id."""
+    return _password_hasher.hash(password)
 
 
 def verify_password(password: str, hashed_password: str) -> bool:
-    """Verify password against hash."""
+    """Verify password against an Argon2id hash (or a legacy salted SHA-256 hash)."""
+    if not hashed_password.startswith('$argon2'):
+        try:
+            salt, password_hash = hashed_password.split(':')
+        except ValueError:
+            return False
+        legacy_hash = hashlib.sha256((password + salt).encode()).hexdigest()
+        return hmac.compare_digest(legacy_hash, password_hash)
+    
     try:
-        salt, password_hash = hashed_password.split(':')
-        return hashlib.sha256((password + salt).encode()).hexdigest() == password_hash
-    except ValueError:
+        return _password_hasher.verify(hashed_password, password)
+    except (VerifyMismatchError, InvalidHashError):
         return False
 
 
@@ -159,7 +203,11 @@ def generate_secure_token(length: int = 32) -> str:
 
 def generate_numeric_code(length: int = 6) -> str:
     """Generate a numeric code for verification."""
-    return ''.join(secrets.choice('0123456789') for _ in range(length))
+    code = ''
+    while len(code) < length:
+        # One CSPRNG draw per round; bytes 250-255 are dropped so every digit is equally likely
+        code += secrets.token_bytes(length).translate(_DIGIT_TABLE, _BIASED_BYTES).decode('ascii')
+    return code[:length]
 
 
 # Image processing functions
@@ -170,6 +218,10 @@ def compress_image(image_content: bytes, max_width: int = 1920, max_height: int
         # Open image
         image = Image.open(BytesIO(image_content))
         
+        # Let libjpeg decode large JPEGs at a reduced scale (never below the target size)
+        if image.format == 'JPEG' and format == 'JPEG':
+            image.draft('RGB', (max_width, max_height))
+        
         # Convert to RGB if necessary (for JPEG)
         if format == 'JPEG' and image.mode in ('RGBA', 'LA', 'P'):
             # Create white background
@@ -232,16 +284,18 @@ def get_image_info(image_content: bytes) -> Dict[str, Any]:
 
 
 # Text processing functions
+def _collapse_tags_and_whitespace(match: re.Match) -> str:
+    """Drop a run of tags, keeping a single space if it also contained whitespace."""
+    return ' ' if match.group(1) else ''
+
+
 def sanitize_text(text: str, max_length: Optional[int] = None) -> str:
     """Sanitize text input by removing harmful characters."""
     if not text:
         return ""
     
-    # Remove HTML tags
-    text = re.sub(r'<[^>]+>', '', text)
-    
-    # Remove excessive whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
+    # Remove HTML tags and collapse whitespace in one pass
+    text = _TAGS_AND_WHITESPACE_RE.sub(_collapse_tags_and_whitespace, text).strip()
     
     # Truncate if necessary
     if max_length and len(text) > max_length:
@@ -256,20 +310,10 @@ def extract_keywords(text: str, max_keywords: int = 10) -> List[str]:
         return []
     
     # Convert to lowercase and remove punctuation
-    words = re.findall(r'\b[a-zA-Z]{3,}\b', text.lower())
-    
-    # Remove common stop words
-    stop_words = {
-        'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
-        'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did',
-        'will', 'would', 'could', 'should', 'may', 'might', 'can', 'this', 'that', 'these', 'those'
-    }
+    words = _WORD_RE.findall(text.lower())
     
-    keywords = [word for word in words if word not in stop_words]
-    
-    # Count frequency and return most common
-    from collections import Counter
-    word_counts = Counter(keywords)
+    # Remove common stop words and count frequency
+    word_counts = Counter(word for word in words if word not in _STOP_WORDS)
     
     return [word for word, count in word_counts.most_common(max_keywords)]
 
@@ -280,7 +324,7 @@ def format_phone_number(phone: str, country_code: str = '+1') -> str:
         return ""
     
     # Remove all non-digit characters
-    digits = re.sub(r'\D', '', phone)
+    digits = _NON_DIGIT_RE.sub('', phone)
     
     if len(digits) == 10:  # US format without country code
         return f"{country_code}({digits[:3]}) {digits[3:6]}-{digits[6:]}"
@@ -329,16 +373,21 @@ def format_relative_time(timestamp: Union[str, datetime]) -> str:
 
 def add_business_days(start_date: datetime, business_days: int) -> datetime:
     """Add business days to a date (excluding weekends)."""
-    current_date = start_date
-    days_added = 0
+    if business_days <= 0:
+        return start_date
+    
+    # Counting from a weekend is the same as counting from the Friday before it
+    weekday = start_date.weekday()  # Monday = 0, Sunday = 6
+    if weekday >= 5:
+        start_date -= timedelta(days=weekday - 4)
+        weekday = 4
     
-    while days_added < business_days:
-        current_date += timedelta(days=1)
-        # Monday = 0, Sunday = 6
-        if current_date.weekday() < 5:  # Monday to Friday
-            days_added += 1
+    weeks, extra_days = divmod(business_days, 5)
+    days = weeks * 7 + extra_days
+    if weekday + extra_days >= 5:  # The remainder crosses a weekend
+        days += 2
     
-    return current_date
+    return start_date + timedelta(days=days)
 
 
 def calculate_business_days_between(start_date: datetime, end_date: datetime) -> int:
@@ -346,15 +395,13 @@ def calculate_business_days_between(start_date: datetime, end_date: datetime) ->
     if start_date > end_date:
         start_date, end_date = end_date, start_date
     
-    business_days = 0
-    current_date = start_date
-    
-    while current_date < end_date:
-        if current_date.weekday() < 5:  # Monday to Friday
-            business_days += 1
-        current_date += timedelta(days=1)
+    # Days counted are start_date, start_date + 1 day, ... while still before end_date
+    span = end_date - start_date
+    total_days = span.days + (1 if span.seconds or span.microseconds else 0)
     
-    return business_days
+    full_weeks, remaining_days = divmod(total_days, 7)
+    weekday = start_date.weekday()
+    return full_weeks * 5 + sum(1 for i in range(remaining_days) if (weekday + i) % 7 < 5)
 
 
 # File and path functions
@@ -391,13 +438,8 @@ def is_safe_filename(filename: str) -> bool:
     if not filename:
         return False
     
-    # Check for path traversal attempts
-    if '..' in filename or '/' in filename or '\\' in filename:
-        return False
-    
-    # Check for reserved characters
-    reserved_chars = '<>:"|?*'
-    if any(char in filename for char in reserved_chars):
+    # Check for path traversal attempts and reserved characters
+    if '..' in filename or not _UNSAFE_FILENAME_CHARS.isdisjoint(filename):
         return False
     
     # Check length
@@ -460,6 +502,26 @@ def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     return c * r
 
 
+def calculate_distances(lat: float, lon: float,
+                        points: List[Tuple[float, float]]) -> List[float]:
+    """Calculate Haversine distances (in km) from one point to many (lat, lon) points."""
+    import math
+    
+    # The origin's terms are shared by every point, so compute them once
+    lat1 = math.radians(lat)
+    lon1 = math.radians(lon)
+    cos_lat1 = math.cos(lat1)
+    radians, sin, cos, asin, sqrt = math.radians, math.sin, math.cos, math.asin, math.sqrt
+    
+    distances = []
+    for lat2, lon2 in points:
+        lat2 = radians(lat2)
+        a = sin((lat2 - lat1) / 2) ** 2 + cos_lat1 * cos(lat2) * sin((radians(lon2) - lon1) / 2) ** 2
+        distances.append(12742 * asin(sqrt(a)))
+    
+    return distances
+
+
 def format_distance(distance_km: float) -> str:
     """Format distance in human-readable format."""
     if distance_km < 1:
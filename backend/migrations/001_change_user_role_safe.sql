@@ -0,0 +1,27 @@
+-- Change a user's role without ever demoting the last admin.
+-- Returns the updated profile row, or no rows when the user does not
+-- exist or is the last remaining admin.
+CREATE OR REPLACE FUNCTION change_user_role_safe(p_user_id uuid, p_new_role text)
+RETURNS SETOF profiles
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_current_role text;
+BEGIN
+    -- Serialize role changes so concurrent demotions cannot both pass the admin count
+    PERFORM pg_advisory_xact_lock(hashtext('change_user_role_safe'));
+
+    SELECT role INTO v_current_role FROM profiles WHERE id = p_user_id FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+
+    IF v_current_role = 'admin' AND p_new_role <> 'admin'
+       AND (SELECT count(*) FROM profiles WHERE role = 'admin') <= 1 THEN
+        RETURN;
+    END IF;
+
+    RETURN QUERY
+        UPDATE profiles SET role = p_new_role WHERE id = p_user_id RETURNING *;
+END;
+$$;
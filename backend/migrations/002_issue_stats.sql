@@ -0,0 +1,19 @@
+-- Issue counts per status, per category and overall in one pass.
+-- grouping_status / grouping_category are GROUPING() flags: 1 when that
+-- column is aggregated away. Rows with only grouping_category = 1 are
+-- status totals, rows with only grouping_status = 1 are category totals,
+-- and the row with both is the grand total. A NULL status or category
+-- is then still its own group rather than being mistaken for a total.
+CREATE OR REPLACE FUNCTION issue_stats(filter_ids int[] DEFAULT NULL, citizen uuid DEFAULT NULL)
+RETURNS TABLE(status text, category text, cnt bigint,
+              grouping_status int, grouping_category int)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT i.status::text, i.category::text, count(*),
+           GROUPING(i.status), GROUPING(i.category)
+    FROM issues i
+    WHERE (filter_ids IS NULL OR i.id = ANY(filter_ids))
+      AND (citizen IS NULL OR i.citizen_id = citizen)
+    GROUP BY GROUPING SETS ((i.status), (i.category), ());
+$$;
@@ -0,0 +1,46 @@
+-- Spatial lookup of issues around a point, backed by a GiST index.
+CREATE EXTENSION IF NOT EXISTS postgis;
+
+-- geog is a computed field rather than a stored column so the PostGIS
+-- value stays out of issues.* (and every API payload). The function
+-- inlines to the same expression as the index below, so ST_DWithin and
+-- <-> on geog(i) use the GiST index. ST_MakePoint is strict, so issues
+-- without coordinates get NULL.
+CREATE OR REPLACE FUNCTION geog(issues)
+RETURNS geography
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT ST_SetSRID(ST_MakePoint($1.longitude, $1.latitude), 4326)::geography;
+$$;
+
+CREATE INDEX IF NOT EXISTS issues_geog_gix
+    ON issues USING GIST ((ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)::geography));
+
+-- Issues within radius_km of (lat, lng), nearest first, as a JSON array.
+-- Each element is the issue with its citizen profile embedded and the
+-- distance in km. p_filters is matched by containment, so it only
+-- supports equality filters.
+CREATE OR REPLACE FUNCTION nearby_issues(lat float8, lng float8, radius_km float8,
+                                         lim int, p_filters jsonb DEFAULT NULL)
+RETURNS jsonb
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT coalesce(jsonb_agg(nearby.issue ORDER BY nearby.distance), '[]'::jsonb)
+    FROM (
+        SELECT to_jsonb(i)
+               || jsonb_build_object(
+                    'distance', round((ST_Distance(geog(i), origin.g) / 1000)::numeric, 2),
+                    'profiles', jsonb_build_object('full_name', p.full_name, 'phone', p.phone)
+                  ) AS issue,
+               geog(i) <-> origin.g AS distance
+        FROM issues i
+        CROSS JOIN (SELECT ST_SetSRID(ST_MakePoint(lng, lat), 4326)::geography AS g) origin
+        LEFT JOIN profiles p ON p.id = i.citizen_id
+        WHERE ST_DWithin(geog(i), origin.g, radius_km * 1000)
+          AND (p_filters IS NULL OR to_jsonb(i) @> p_filters)
+        ORDER BY geog(i) <-> origin.g
+        LIMIT lim
+    ) nearby;
+$$;
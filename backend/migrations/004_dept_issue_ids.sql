@@ -0,0 +1,11 @@
+-- Distinct ids of issues assigned to staff of a department, as one array.
+CREATE OR REPLACE FUNCTION dept_issue_ids(dept text)
+RETURNS int[]
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT coalesce(array_agg(DISTINCT a.issue_id), '{}')
+    FROM issue_assignments a
+    JOIN profiles p ON p.id = a.staff_id
+    WHERE p.department = dept AND p.role = 'staff';
+$$;
@@ -0,0 +1,14 @@
+-- One vote per user per issue, enforced by the database.
+CREATE UNIQUE INDEX IF NOT EXISTS issue_votes_issue_user_key ON issue_votes (issue_id, user_id);
+
+-- Record a vote. Returns the new vote row, or no rows if the user had
+-- already voted. A missing issue surfaces as a foreign key violation.
+CREATE OR REPLACE FUNCTION cast_vote(iid int, uid uuid)
+RETURNS SETOF issue_votes
+LANGUAGE sql
+AS $$
+    INSERT INTO issue_votes (issue_id, user_id)
+    VALUES (iid, uid)
+    ON CONFLICT (issue_id, user_id) DO NOTHING
+    RETURNING *;
+$$;
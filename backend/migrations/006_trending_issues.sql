@@ -0,0 +1,33 @@
+-- Issues ranked by recent activity (votes weigh twice as much as updates),
+-- as a JSON array. Each element is the issue with its citizen name
+-- embedded plus trending_score, recent_votes and recent_updates.
+CREATE OR REPLACE FUNCTION trending(since timestamptz, lim int)
+RETURNS jsonb
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT coalesce(jsonb_agg(ranked.issue ORDER BY ranked.score DESC), '[]'::jsonb)
+    FROM (
+        SELECT to_jsonb(i)
+               || jsonb_build_object(
+                    'profiles', jsonb_build_object('full_name', p.full_name),
+                    'trending_score', 2 * coalesce(v.cnt, 0) + coalesce(u.cnt, 0),
+                    'recent_votes', coalesce(v.cnt, 0),
+                    'recent_updates', coalesce(u.cnt, 0)
+                  ) AS issue,
+               2 * coalesce(v.cnt, 0) + coalesce(u.cnt, 0) AS score
+        FROM issues i
+        LEFT JOIN (
+            SELECT issue_id, count(*) AS cnt FROM issue_votes
+            WHERE created_at >= since GROUP BY issue_id
+        ) v ON v.issue_id = i.id
+        LEFT JOIN (
+            SELECT issue_id, count(*) AS cnt FROM issue_updates
+            WHERE created_at >= since GROUP BY issue_id
+        ) u ON u.issue_id = i.id
+        LEFT JOIN profiles p ON p.id = i.citizen_id
+        WHERE v.cnt IS NOT NULL OR u.cnt IS NOT NULL
+        ORDER BY score DESC
+        LIMIT lim
+    ) ranked;
+$$;
@@ -0,0 +1,23 @@
+-- Delete votes, updates and assignments together with their issue.
+-- Recreates the existing foreign keys to issues with ON DELETE CASCADE.
+DO $$
+DECLARE
+    r record;
+BEGIN
+    FOR r IN
+        SELECT c.conname, c.conrelid::regclass AS tbl, a.attname AS col
+        FROM pg_constraint c
+        JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = ANY (c.conkey)
+        WHERE c.contype = 'f'
+          AND c.confrelid = 'issues'::regclass
+          AND c.conrelid IN ('issue_votes'::regclass,
+                             'issue_updates'::regclass,
+                             'issue_assignments'::regclass)
+    LOOP
+        EXECUTE format('ALTER TABLE %s DROP CONSTRAINT %I', r.tbl, r.conname);
+        EXECUTE format('ALTER TABLE %s ADD CONSTRAINT %I FOREIGN KEY (%I) '
+                       'REFERENCES issues (id) ON DELETE CASCADE',
+                       r.tbl, r.conname, r.col);
+    END LOOP;
+END;
+$$;
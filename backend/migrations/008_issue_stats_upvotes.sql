@@ -0,0 +1,16 @@
+-- Add the upvote total to issue_stats so statistics need no row fetch for it.
+DROP FUNCTION IF EXISTS issue_stats(int[], uuid);
+
+CREATE OR REPLACE FUNCTION issue_stats(filter_ids int[] DEFAULT NULL, citizen uuid DEFAULT NULL)
+RETURNS TABLE(status text, category text, cnt bigint, upvotes bigint,
+              grouping_status int, grouping_category int)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT i.status::text, i.category::text, count(*), coalesce(sum(i.upvotes), 0),
+           GROUPING(i.status), GROUPING(i.category)
+    FROM issues i
+    WHERE (filter_ids IS NULL OR i.id = ANY(filter_ids))
+      AND (citizen IS NULL OR i.citizen_id = citizen)
+    GROUP BY GROUPING SETS ((i.status), (i.category), ());
+$$;
@@ -0,0 +1,17 @@
+-- A user's most recent issue creations and votes since a point in time,
+-- newest first.
+CREATE OR REPLACE FUNCTION user_activity(uid uuid, since timestamptz, lim int)
+RETURNS TABLE(type text, ts timestamptz, issue_id int, title text)
+LANGUAGE sql
+STABLE
+AS $$
+    (SELECT 'issue_created', i.created_at, i.id, i.title
+     FROM issues i
+     WHERE i.citizen_id = uid AND i.created_at >= since)
+    UNION ALL
+    (SELECT 'vote_cast', v.created_at, v.issue_id, NULL
+     FROM issue_votes v
+     WHERE v.user_id = uid AND v.created_at >= since)
+    ORDER BY 2 DESC
+    LIMIT lim;
+$$;
@@ -0,0 +1,13 @@
+-- Number of distinct issues assigned to each department's staff,
+-- including departments whose staff have no assignments.
+CREATE OR REPLACE FUNCTION issues_per_department()
+RETURNS TABLE(department text, cnt bigint)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT p.department::text, count(DISTINCT a.issue_id)
+    FROM profiles p
+    LEFT JOIN issue_assignments a ON a.staff_id = p.id
+    WHERE p.role = 'staff' AND p.department IS NOT NULL
+    GROUP BY p.department;
+$$;
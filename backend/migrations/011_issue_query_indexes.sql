@@ -0,0 +1,17 @@
+-- Indexes for the filters IssuesService applies most often.
+-- issue_votes (issue_id, user_id) is already covered by the unique index
+-- from 005_cast_vote.sql.
+CREATE INDEX IF NOT EXISTS issues_status_category_created
+    ON issues (status, category, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS issues_citizen_created
+    ON issues (citizen_id, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS issues_upvotes
+    ON issues (upvotes DESC) WHERE upvotes >= 10;
+
+CREATE INDEX IF NOT EXISTS issue_votes_created
+    ON issue_votes (created_at);
+
+CREATE INDEX IF NOT EXISTS issue_assignments_staff
+    ON issue_assignments (staff_id);
@@ -0,0 +1,78 @@
+-- Denormalized, time-decayed trending score maintained on write.
+--
+-- trending_score stores ln(sum(weight * exp((t - epoch) / tau))) over all
+-- votes (weight 2) and updates (weight 1). Ordering by the stored value
+-- equals ordering by the current decayed score, so idle rows never need
+-- rewriting and the column can be indexed. trending_now() converts it to
+-- the decayed score as of now (half-life 3.5 days).
+ALTER TABLE issues
+    ADD COLUMN IF NOT EXISTS trending_score float8,
+    ADD COLUMN IF NOT EXISTS trending_updated_at timestamptz;
+
+CREATE INDEX IF NOT EXISTS issues_trending_score
+    ON issues (trending_score DESC) WHERE trending_score IS NOT NULL;
+
+-- ln(weight) + (at - epoch) / tau, with tau = 3.5 days / ln 2
+CREATE OR REPLACE FUNCTION trending_log_weight(weight float8, at timestamptz)
+RETURNS float8
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT ln(weight)
+           + extract(epoch FROM at - timestamptz '2025-01-01 00:00:00+00') / (302400 / ln(2));
+$$;
+
+CREATE OR REPLACE FUNCTION bump_trending_score()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    x float8 := trending_log_weight(CASE TG_TABLE_NAME WHEN 'issue_votes' THEN 2 ELSE 1 END, now());
+BEGIN
+    UPDATE issues
+    SET trending_score = CASE
+            WHEN trending_score IS NULL THEN x
+            ELSE greatest(trending_score, x) + ln(1 + exp(-abs(trending_score - x)))
+        END,
+        trending_updated_at = now()
+    WHERE id = NEW.issue_id;
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS issue_votes_trending ON issue_votes;
+CREATE TRIGGER issue_votes_trending
+    AFTER INSERT ON issue_votes
+    FOR EACH ROW EXECUTE FUNCTION bump_trending_score();
+
+DROP TRIGGER IF EXISTS issue_updates_trending ON issue_updates;
+CREATE TRIGGER issue_updates_trending
+    AFTER INSERT ON issue_updates
+    FOR EACH ROW EXECUTE FUNCTION bump_trending_score();
+
+-- Computed column: current decayed score, selectable as "trending_now"
+CREATE OR REPLACE FUNCTION trending_now(issues)
+RETURNS float8
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT exp($1.trending_score - trending_log_weight(1, now()));
+$$;
+
+-- Backfill from existing activity
+UPDATE issues i
+SET trending_score = s.score,
+    trending_updated_at = s.last_at
+FROM (
+    SELECT issue_id, ln(sum(exp(x))) AS score, max(created_at) AS last_at
+    FROM (
+        SELECT issue_id, created_at, trending_log_weight(2, created_at) AS x FROM issue_votes
+        UNION ALL
+        SELECT issue_id, created_at, trending_log_weight(1, created_at) FROM issue_updates
+    ) activity
+    GROUP BY issue_id
+) s
+WHERE s.issue_id = i.id;
+
+-- Replaced by the stored score
+DROP FUNCTION IF EXISTS trending(timestamptz, int);
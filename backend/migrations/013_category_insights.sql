@@ -0,0 +1,42 @@
+-- All category insight aggregates in one row: counts, upvotes, average
+-- resolution time (whole days, as before) and the five busiest
+-- locations rounded to two decimal places.
+CREATE OR REPLACE FUNCTION category_insights(cat text, days int)
+RETURNS TABLE(
+    total bigint,
+    pending bigint,
+    resolved bigint,
+    recent bigint,
+    sum_upvotes bigint,
+    avg_resolution_days numeric,
+    top_locations jsonb
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        count(*),
+        count(*) FILTER (WHERE i.status = 'pending'),
+        count(*) FILTER (WHERE i.status = 'resolved'),
+        count(*) FILTER (WHERE i.created_at >= now() - make_interval(days => days)),
+        coalesce(sum(i.upvotes), 0)::bigint,
+        round(avg(floor(extract(epoch FROM i.updated_at - i.created_at) / 86400))
+              FILTER (WHERE i.status = 'resolved'), 1),
+        (
+            SELECT coalesce(jsonb_agg(loc), '[]'::jsonb)
+            FROM (
+                SELECT round(l.latitude::numeric, 2) AS lat,
+                       round(l.longitude::numeric, 2) AS lng,
+                       count(*) AS count
+                FROM issues l
+                WHERE l.category::text = cat
+                  AND l.latitude IS NOT NULL AND l.latitude <> 0
+                  AND l.longitude IS NOT NULL AND l.longitude <> 0
+                GROUP BY 1, 2
+                ORDER BY count(*) DESC
+                LIMIT 5
+            ) loc
+        )
+    FROM issues i
+    WHERE i.category::text = cat;
+$$;
@@ -0,0 +1,29 @@
+-- Per-department staff count and status breakdown of the distinct issues
+-- assigned to that department's staff, for every department that has
+-- staff or supervisors.
+CREATE OR REPLACE FUNCTION department_stats()
+RETURNS TABLE(
+    department text,
+    total_staff bigint,
+    total_issues bigint,
+    pending_issues bigint,
+    in_progress_issues bigint,
+    resolved_issues bigint
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        p.department::text,
+        count(DISTINCT p.id) FILTER (WHERE p.role = 'staff'),
+        count(DISTINCT a.issue_id),
+        count(DISTINCT i.id) FILTER (WHERE i.status = 'pending'),
+        count(DISTINCT i.id) FILTER (WHERE i.status = 'in_progress'),
+        count(DISTINCT i.id) FILTER (WHERE i.status = 'resolved')
+    FROM profiles p
+    LEFT JOIN issue_assignments a ON a.staff_id = p.id AND p.role = 'staff'
+    LEFT JOIN issues i ON i.id = a.issue_id
+    WHERE p.role IN ('staff', 'supervisor')
+      AND p.department IS NOT NULL AND p.department::text <> ''
+    GROUP BY p.department;
+$$;
@@ -0,0 +1,32 @@
+-- Apply a JSON array of partial row updates to a table in one call.
+-- Each patch names the row by match_key and sets only the other keys it
+-- contains; returns the updated rows as a jsonb array.
+CREATE OR REPLACE FUNCTION bulk_patch(tbl regclass, match_key text, patches jsonb)
+RETURNS jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    patch jsonb;
+    set_list text;
+    updated jsonb;
+    result jsonb := '[]'::jsonb;
+BEGIN
+    FOR patch IN SELECT value FROM jsonb_array_elements(patches) LOOP
+        SELECT string_agg(format('%I = r.%I', k, k), ', ')
+        INTO set_list
+        FROM jsonb_object_keys(patch - match_key) AS k;
+
+        CONTINUE WHEN set_list IS NULL;
+
+        FOR updated IN EXECUTE format(
+            'UPDATE %s t SET %s FROM jsonb_populate_record(NULL::%s, $1) r '
+            'WHERE t.%I = r.%I RETURNING to_jsonb(t)',
+            tbl, set_list, tbl, match_key, match_key
+        ) USING patch LOOP
+            result := result || jsonb_build_array(updated);
+        END LOOP;
+    END LOOP;
+
+    RETURN result;
+END;
+$$;
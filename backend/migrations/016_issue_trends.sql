@@ -0,0 +1,15 @@
+-- Issues created per UTC day over the last `days` days, and how many of
+-- each day's issues are now resolved.
+CREATE OR REPLACE FUNCTION issue_trends(days int)
+RETURNS TABLE(day date, created bigint, resolved bigint)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT (i.created_at AT TIME ZONE 'UTC')::date AS day,
+           count(*),
+           count(*) FILTER (WHERE i.status = 'resolved')
+    FROM issues i
+    WHERE i.created_at >= now() - make_interval(days => days)
+    GROUP BY 1
+    ORDER BY 1;
+$$;
@@ -0,0 +1,20 @@
+-- Full-text search over issue titles and descriptions. Replaces the
+-- leading-wildcard ILIKE filters, which cannot use an index.
+--
+-- search_vec is a computed field rather than a stored column so it stays
+-- out of issues.* (and every API payload). PostgREST can still filter on
+-- it (search_vec=wfts(english).term); the function inlines to the same
+-- expression as the index below, so the filter uses the GIN index.
+CREATE OR REPLACE FUNCTION search_vec(issues)
+RETURNS tsvector
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT to_tsvector('english'::regconfig,
+                       coalesce($1.title, '') || ' ' || coalesce($1.description, ''));
+$$;
+
+CREATE INDEX IF NOT EXISTS issues_search_vec
+    ON issues USING GIN (
+        to_tsvector('english'::regconfig, coalesce(title, '') || ' ' || coalesce(description, ''))
+    );
@@ -0,0 +1,27 @@
+-- Let issue_stats filter by department server-side (same join as
+-- dept_issue_ids) instead of taking the department's issue ids from the
+-- client, and return the average resolution time in whole days.
+DROP FUNCTION IF EXISTS issue_stats(int[], uuid);
+
+CREATE OR REPLACE FUNCTION issue_stats(filter_ids int[] DEFAULT NULL, citizen uuid DEFAULT NULL,
+                                       dept text DEFAULT NULL)
+RETURNS TABLE(status text, category text, cnt bigint, upvotes bigint,
+              avg_resolution_days numeric, grouping_status int, grouping_category int)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT i.status::text, i.category::text, count(*), coalesce(sum(i.upvotes), 0),
+           avg(floor(extract(epoch FROM i.updated_at - i.created_at) / 86400))
+               FILTER (WHERE i.status = 'resolved'),
+           GROUPING(i.status), GROUPING(i.category)
+    FROM issues i
+    WHERE (filter_ids IS NULL OR i.id = ANY(filter_ids))
+      AND (citizen IS NULL OR i.citizen_id = citizen)
+      AND (dept IS NULL OR EXISTS (
+          SELECT 1
+          FROM issue_assignments a
+          JOIN profiles p ON p.id = a.staff_id
+          WHERE a.issue_id = i.id AND p.department = dept AND p.role = 'staff'
+      ))
+    GROUP BY GROUPING SETS ((i.status), (i.category), ());
+$$;